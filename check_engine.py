@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+页面检查引擎
+把声明式检查表编译一次，之后每个文档只需调用一次 scan 就得到全部检查项的结果
+"""
+
+import re
+
+class CheckEngine:
+    """由检查表编译出的匹配器
+
+    检查表每项为 (分组, 名称, 模式, 是否正则)。count_groups 中的分组需要出现次数，
+    其余分组只判断是否出现，命中第一次即停止扫描。
+    字面量模式用 str 的 count / in 在C层直接扫描，正则在构造时编译好；
+    同一模式在表中出现多次时只扫描一次。
+    计数与逐个模式 re.findall / str.count 的结果一致（不重叠计数）。
+
+    注意：这不是单遍匹配，每个不同的模式各扫描一遍文本，耗时为 O(模式数 × 文本长度)。
+    把全部模式合成一个带命名分组的正则分支只扫描一遍，在 2.5MB 的页面上反而慢 5~7 倍：
+    CPython 的 re 在每个位置都要逐个尝试各分支，而单个字面量可以用C层的快速查找跳过；
+    Aho-Corasick 需要引入新的C扩展依赖。检查表只有十来项，逐个模式扫描更快。
+    """
+
+    def __init__(self, table, count_groups=()):
+        self.table = list(table)
+        self.count_groups = set(count_groups)
+        self._scanners = []
+        self._slots = []
+        index = {}
+        for group, name, pattern, is_regex in self.table:
+            counted = group in self.count_groups
+            key = (pattern, is_regex, counted)
+            if key not in index:
+                index[key] = len(self._scanners)
+                self._scanners.append(self._compile(pattern, is_regex, counted))
+            self._slots.append((group, name, index[key]))
+
+    @staticmethod
+    def _compile(pattern, is_regex, counted):
+        if not is_regex:
+            if not pattern:
+                raise ValueError("检查模式不能为空")
+            if counted:
+                return lambda text: text.count(pattern)
+            return lambda text: int(pattern in text)
+
+        compiled = re.compile(pattern)
+        if compiled.match(''):
+            raise ValueError(f"检查模式不能匹配空串: {pattern}")
+        if counted:
+            return lambda text: len(compiled.findall(text))
+        return lambda text: int(compiled.search(text) is not None)
+
+    def scan(self, text):
+        """对文本运行全部检查，按检查表返回 {分组: {名称: 次数}}，保持表中的顺序
+
+        不计数的分组结果为 1（出现）或 0（未出现）。
+        """
+        results = [scanner(text) for scanner in self._scanners]
+        found = {}
+        for group, name, index in self._slots:
+            found.setdefault(group, {})[name] = results[index]
+        return found
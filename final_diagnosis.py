@@ -3,74 +3,67 @@
 最终诊断报告
 """
 
-import requests
 import time
 
-def final_diagnosis():
-    """最终诊断"""
-    print("🔍 网站问题最终诊断报告")
-    print("=" * 60)
-    print("⏰ 诊断时间:", time.strftime("%Y-%m-%d %H:%M:%S"))
-    print()
+from site_verifier import parse_args, verify_from_args, print_results
+
+def check_page(page):
+    """诊断单个页面，返回服务器端检查是否全部通过"""
+    passed = True
 
     # 服务器状态检查
     print("🖥️  服务器状态检查:")
-    try:
-        response = requests.get("http://localhost:3000", timeout=10)
-        print(f"✅ HTTP状态: {response.status_code}")
-        print(f"✅ 响应时间: {response.elapsed.total_seconds():.2f}秒")
-        print(f"✅ 页面大小: {len(response.text):,} 字节")
-        server_ok = True
-    except:
-        print("❌ 服务器无响应")
-        server_ok = False
-
-    if not server_ok:
-        print("\n❌ 服务器问题 - 请确保开发服务器正在运行")
-        return
+    print(f"✅ HTTP状态: {page.status}")
+    print(f"✅ 响应时间: {page.elapsed:.2f}秒")
+    print(f"✅ 页面大小: {len(page.html):,} 字节")
 
     # 样式系统检查
     print("\n🎨 样式系统检查:")
-    html = response.text
-
-    css_url = "http://localhost:3000/_next/static/css/app/layout.css"
-    css_response = requests.get(css_url, timeout=10)
+    html = page.html
+    document = page.document
 
-    if css_response.status_code == 200:
+    if page.css_ok:
         print("✅ CSS文件可访问")
-        css = css_response.text
+        stylesheet = page.stylesheet
 
         key_css_elements = [
-            ("CSS变量定义", "--background:"),
-            ("主题配置", "@theme inline"),
-            ("Body样式", "body {"),
-            ("Tailwind指令", "@layer"),
+            ("CSS变量定义", stylesheet.defines("--background")),
+            ("主题配置", stylesheet.has_at_rule("theme", "inline")),
+            ("Body样式", stylesheet.has_rule("body")),
+            ("Tailwind指令", stylesheet.has_at_rule("layer")),
         ]
 
-        for name, pattern in key_css_elements:
-            if pattern in css:
+        for name, ok in key_css_elements:
+            if ok:
                 print(f"✅ {name}")
             else:
                 print(f"❌ {name}")
+                passed = False
     else:
-        print(f"❌ CSS文件无法访问: {css_response.status_code}")
+        statuses = [str(status) for status, _ in page.stylesheets.values() if status != 200]
+        print(f"❌ CSS文件无法访问: {', '.join(statuses) or '未引用样式表'}")
+        passed = False
 
     # 页面结构检查
     print("\n🏗️  页面结构检查:")
     structure_checks = [
-        ("导航栏", "<nav"),
-        ("主要内容区", "<section"),
-        ("个人标题", "杜亚楠"),
-        ("职业描述", "内容创意策划"),
-        ("数据统计", "15亿+"),
-        ("作品集", "作品集"),
+        ("导航栏", document.has_tag("nav")),
+        ("主要内容区", document.has_tag("section")),
+        ("个人标题", "杜亚楠" in html),
     ]
+    if page.is_home:
+        structure_checks += [
+            ("职业描述", "内容创意策划" in html),
+            ("数据统计", "15亿+" in html),
+            ("作品集", "作品集" in html),
+        ]
 
-    for name, pattern in structure_checks:
-        if pattern in html:
+    for name, ok in structure_checks:
+        if ok:
             print(f"✅ {name}")
         else:
             print(f"❌ {name}")
+            passed = False
 
     # 样式类应用检查
     print("\n🎯 样式类应用检查:")
@@ -85,13 +78,31 @@ def final_diagnosis():
         ("弹性布局", "flex"),
     ]
 
-    for name, pattern in class_checks:
-        count = html.count(pattern)
+    for name, class_name in class_checks:
+        count = document.count_class(class_name)
         if count > 0:
             print(f"✅ {name}: {count}次")
         else:
             print(f"❌ {name}: 0次")
 
+    return passed
+
+def final_diagnosis(args=None):
+    """最终诊断"""
+    args = args or parse_args("网站问题最终诊断", [])
+
+    print("🔍 网站问题最终诊断报告")
+    print("=" * 60)
+    print("⏰ 诊断时间:", time.strftime("%Y-%m-%d %H:%M:%S"))
+    print()
+
+    pages, results = verify_from_args([check_page], args)
+    print_results(results)
+
+    if not any(page.status for page in pages):
+        print("\n❌ 服务器问题 - 请确保开发服务器正在运行")
+        return
+
     # 问题分析
     print("\n🔍 问题分析:")
     print("根据分析，服务器端完全正常，问题可能在：")
@@ -115,6 +126,10 @@ def final_diagnosis():
     print("   3. 禁用浏览器扩展程序")
     print("   4. 尝试无痕模式访问")
 
+    if not all(results.values()):
+        print("\n⚠️  部分页面的服务器端检查未通过，请先查看上方的 ❌ 项")
+        return
+
     # 最终确认
     print("\n✅ 最终确认:")
     print("• 服务器运行正常")
@@ -128,4 +143,4 @@ def final_diagnosis():
     print("如果浏览器仍显示异常，请执行上述浏览器端操作。")
 
 if __name__ == "__main__":
-    final_diagnosis()
\ No newline at end of file
+    final_diagnosis(parse_args("网站问题最终诊断"))
@@ -4,106 +4,115 @@
 确认网站布局和样式完全恢复
 """
 
-import requests
-import re
 import sys
-from urllib.parse import urljoin
-
-def test_website_recovery():
-    """测试网站恢复情况"""
-    base_url = "http://localhost:3000"
-
-    print("🔍 开始网站最终验证...")
-    print("=" * 50)
-
-    try:
-        # 测试主页响应
-        response = requests.get(base_url, timeout=10)
-        if response.status_code != 200:
-            print(f"❌ HTTP响应错误: {response.status_code}")
-            return False
-
-        print("✅ HTTP响应正常 (200)")
-
-        # 检查HTML结构
-        html_content = response.text
-
-        # 检查关键HTML元素
-        checks = [
-            ("DOCTYPE声明", "<!DOCTYPE html>"),
-            ("Next.js样式", "/_next/static/css/app/layout.css"),
-            ("Tailwind CSS类", "bg-background"),
-            ("导航栏", "<nav"),
-            ("主要内容区域", "杜亚楠"),
-            ("作品集标题", "内容创意策划"),
-        ]
-
-        for check_name, check_pattern in checks:
-            if check_pattern in html_content:
-                print(f"✅ {check_name}: 正常")
-            else:
-                print(f"❌ {check_name}: 缺失")
-
-        # 检查CSS样式文件
-        css_url = urljoin(base_url, "/_next/static/css/app/layout.css")
-        css_response = requests.get(css_url, timeout=10)
-
-        if css_response.status_code == 200:
-            print("✅ CSS样式文件加载成功")
-
-            # 检查关键CSS变量
-            css_content = css_response.text
-            css_variables = [
-                "--background",
-                "--foreground",
-                "--primary",
-                "--border",
-                "var(--background)",
-                "@theme inline"
-            ]
-
-            for var_name in css_variables:
-                if var_name in css_content:
-                    print(f"✅ CSS变量 {var_name}: 正常")
-                else:
-                    print(f"❌ CSS变量 {var_name}: 缺失")
 
+from site_verifier import parse_args, verify_from_args, print_results
+
+def check_page(page):
+    """对单个页面运行恢复验证检查，返回是否全部通过"""
+    html_content = page.html
+    document = page.document
+    passed = True
+
+    print("✅ HTTP响应正常 (200)")
+
+    # 检查关键HTML元素
+    checks = [
+        ("DOCTYPE声明", (document.doctype or "").lower() == "doctype html"),
+        ("Next.js样式", any("/_next/static/css/app/layout.css" in url for url in page.stylesheets)),
+        ("Tailwind CSS类", document.has_class("bg-background")),
+        ("导航栏", document.has_tag("nav")),
+        ("主要内容区域", "杜亚楠" in html_content),
+    ]
+    if page.is_home:
+        checks.append(("作品集标题", "内容创意策划" in html_content))
+
+    for check_name, ok in checks:
+        if ok:
+            print(f"✅ {check_name}: 正常")
         else:
-            print(f"❌ CSS样式文件加载失败: {css_response.status_code}")
-
-        # 检查Tailwind CSS类应用
-        tailwind_classes = [
-            "bg-background",
-            "text-foreground",
-            "border-primary",
-            "text-primary",
-            "bg-surface",
-            "border-border"
+            print(f"❌ {check_name}: 缺失")
+            passed = False
+
+    # 检查CSS样式文件
+    if page.css_ok:
+        print("✅ CSS样式文件加载成功")
+
+        # 检查关键CSS变量
+        stylesheet = page.stylesheet
+        css_variables = [
+            ("--background", stylesheet.defines("--background")),
+            ("--foreground", stylesheet.defines("--foreground")),
+            ("--primary", stylesheet.defines("--primary")),
+            ("--border", stylesheet.defines("--border")),
+            ("var(--background)", stylesheet.uses_var("--background")),
+            ("@theme inline", stylesheet.has_at_rule("theme", "inline")),
         ]
 
-        print("\n🎨 Tailwind CSS类应用检查:")
-        for class_name in tailwind_classes:
-            if class_name in html_content:
-                print(f"✅ {class_name}: 已应用")
+        for var_name, ok in css_variables:
+            if ok:
+                print(f"✅ CSS变量 {var_name}: 正常")
             else:
-                print(f"❌ {class_name}: 未应用")
+                print(f"❌ CSS变量 {var_name}: 缺失")
+                passed = False
+
+    else:
+        failed = [f"{url} ({status})" for url, (status, _) in page.stylesheets.items() if status != 200]
+        print(f"❌ CSS样式文件加载失败: {', '.join(failed) or '未引用样式表'}")
+        passed = False
+
+    # 检查Tailwind CSS类应用
+    tailwind_classes = [
+        "bg-background",
+        "text-foreground",
+        "border-primary",
+        "text-primary",
+        "bg-surface",
+        "border-border"
+    ]
+
+    print("\n🎨 Tailwind CSS类应用检查:")
+    for class_name in tailwind_classes:
+        if document.has_class(class_name):
+            print(f"✅ {class_name}: 已应用")
+        else:
+            print(f"❌ {class_name}: 未应用")
 
-        # 检查页面结构完整性
+    # 检查页面结构完整性（首页专属区块）
+    if page.is_home:
         page_sections = [
-            ("导航栏", "nav"),
-            ("英雄区域", "min-h-[80vh]"),
-            ("工作履历", "工作履历"),
-            ("负责账号", "负责过的账号"),
-            ("AI作品集", "AI方向作品集"),
-            ("策划作品集", "策划作品集"),
+            ("导航栏", document.has_tag("nav")),
+            ("英雄区域", document.has_class("min-h-[80vh]")),
+            ("工作履历", "工作履历" in html_content),
+            ("负责账号", "负责过的账号" in html_content),
+            ("AI作品集", "AI方向作品集" in html_content),
+            ("策划作品集", "策划作品集" in html_content),
         ]
 
         print("\n📄 页面结构完整性检查:")
-        for section_name, section_pattern in page_sections:
-            if section_pattern in html_content:
+        for section_name, ok in page_sections:
+            if ok:
                 print(f"✅ {section_name}: 完整")
             else:
                 print(f"❌ {section_name}: 缺失")
+                passed = False
+
+    return passed
+
+def test_website_recovery(args=None):
+    """测试网站恢复情况（并发检查全部页面）"""
+    args = args or parse_args("网站最终验证", [])
+
+    print("🔍 开始网站最终验证...")
+    print("=" * 50)
+
+    try:
+        _, results = verify_from_args([check_page], args)
+        print_results(results)
+
+        if not results or not all(results.values()):
+            print("❌ 部分页面验证未通过")
+            return False
 
         print("\n" + "=" * 50)
         print("🎉 网站已成功恢复正常！")
@@ -120,5 +129,5 @@ def test_website_recovery():
         return False
 
 if __name__ == "__main__":
-    success = test_website_recovery()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    success = test_website_recovery(parse_args("网站最终验证"))
+    sys.exit(0 if success else 1)
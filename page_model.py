@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+页面解析模型
+用流式HTML分词器建立 类名 -> 元素、元素 -> 祖先 的索引，
+用CSS规则解析建立 选择器 -> 声明、自定义属性 -> 定义 的索引，
+各验证脚本的检查都改为查这些索引，不再对原文做子串计数
+"""
+
+import re
+from html.parser import HTMLParser
+
+# 没有结束标签的元素，不入栈
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+_CSS_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|[{};]|[^{};"\']+')
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CLASS_SELECTOR_RE = re.compile(r'\.((?:\\[0-9a-fA-F]{1,6} ?|\\.|[\w-])+)')
+_CSS_ESCAPE_RE = re.compile(r'\\([0-9a-fA-F]{1,6}) ?|\\(.)')
+_VAR_RE = re.compile(r'var\(\s*(--[\w-]+)')
+
+def split_variants(class_name):
+    """拆出 Tailwind 变体前缀：md:hover:shadow-lg -> shadow-lg；方括号内的冒号不算"""
+    depth = 0
+    start = 0
+    for i, char in enumerate(class_name):
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == ':' and depth == 0:
+            start = i + 1
+    return class_name[start:]
+
+class Element:
+    """文档中的一个元素"""
+
+    __slots__ = ("index", "tag", "attrs", "classes", "parent")
+
+    def __init__(self, index, tag, attrs, parent):
+        self.index = index
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = tuple(attrs.get("class", "").split())
+        self.parent = parent
+
+    def __repr__(self):
+        return f"<{self.tag} #{self.index} class={' '.join(self.classes)!r}>"
+
+class DocumentIndex(HTMLParser):
+    """流式解析HTML，边读边建立索引；可以多次 feed 分块数据
+
+    script/style 内的文本不会被当作标签，所以 Next.js 内联的 RSC 数据里的类名不会被误计。
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.doctype = None
+        self.elements = []
+        # 标签名 -> 元素列表，类名 -> 带有该类的元素列表
+        self.tag_index = {}
+        self.class_index = {}
+        self._stack = []
+
+    def handle_decl(self, decl):
+        if decl.lower().startswith("doctype"):
+            self.doctype = decl
+
+    def handle_starttag(self, tag, attrs):
+        element = self._add(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self._stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self._add(tag, attrs)
+
+    def handle_endtag(self, tag):
+        # 容错：关闭到最近的同名元素，没打开过的结束标签直接忽略
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth].tag == tag:
+                del self._stack[depth:]
+                return
+
+    def _add(self, tag, attrs):
+        parent = self._stack[-1] if self._stack else None
+        element = Element(len(self.elements), tag, {name: value or "" for name, value in attrs}, parent)
+        self.elements.append(element)
+        self.tag_index.setdefault(tag, []).append(element)
+        for class_name in dict.fromkeys(element.classes):
+            self.class_index.setdefault(class_name, []).append(element)
+        return element
+
+    def ancestors(self, element):
+        """元素的祖先，由近到远"""
+        result = []
+        parent = element.parent
+        while parent is not None:
+            result.append(parent)
+            parent = parent.parent
+        return result
+
+    def path(self, element):
+        """元素在文档中的位置，如 html > body > main.grid"""
+        parts = []
+        for node in reversed([element] + self.ancestors(element)):
+            parts.append(node.tag + ''.join('.' + name for name in node.classes[:2]))
+        return ' > '.join(parts)
+
+    def has_tag(self, tag):
+        return tag in self.tag_index
+
+    def count_tags(self, *tags):
+        return sum(len(self.tag_index.get(tag, ())) for tag in tags)
+
+    def has_class(self, class_name):
+        return class_name in self.class_index
+
+    def count_class(self, class_name):
+        """带有该类的元素个数"""
+        return len(self.class_index.get(class_name, ()))
+
+    def count_classes(self, pattern):
+        """带有匹配类的元素个数；类名整体或去掉变体前缀后完整匹配 pattern 都算"""
+        regex = re.compile(pattern)
+        matched = set()
+        for class_name, elements in self.class_index.items():
+            if regex.fullmatch(class_name) or regex.fullmatch(split_variants(class_name)):
+                matched.update(element.index for element in elements)
+        return len(matched)
+
+    def find(self, tag=None, classes=()):
+        """同时带有全部 classes 的元素（可限定标签）"""
+        if classes:
+            candidates = self.class_index.get(classes[0], [])
+            candidates = [e for e in candidates if all(name in e.classes for name in classes[1:])]
+        else:
+            candidates = self.elements
+        return [e for e in candidates if tag is None or e.tag == tag]
+
+    @property
+    def used_classes(self):
+        return set(self.class_index)
+
+def parse_html(html):
+    document = DocumentIndex()
+    document.feed(html)
+    document.close()
+    return document
+
+def unescape_css_identifier(text):
+    """CSS 转义还原：hover\\:shadow-lg -> hover:shadow-lg，\\32 xl -> 2xl"""
+    def replace(match):
+        if match.group(1):
+            return chr(int(match.group(1), 16))
+        return match.group(2)
+    return _CSS_ESCAPE_RE.sub(replace, text)
+
+def split_selectors(prelude):
+    """按顶层逗号拆分选择器列表，括号和方括号里的逗号不拆"""
+    selectors = []
+    depth = 0
+    current = []
+    for char in prelude:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    selectors.append(''.join(current).strip())
+    return [selector for selector in selectors if selector]
+
+class StylesheetIndex:
+    """CSS规则索引
+
+    rules: 选择器 -> {属性: 值}，同一选择器的多条规则按出现顺序合并；
+    at 规则块里的声明（@font-face、@theme inline 等）以 "@名称 参数" 为键。
+    custom_properties: 自定义属性 -> [(选择器, 值)]
+    at_rules: at 规则名 -> [参数]，如 layer -> ['base', 'components']
+    class_selectors: 类名 -> 用到该类的选择器
+    font_faces: 每个 @font-face 块的声明，按出现顺序
+    """
+
+    def __init__(self):
+        self.rules = {}
+        self.custom_properties = {}
+        self.at_rules = {}
+        self.class_selectors = {}
+        self.var_references = set()
+        self.font_faces = []
+
+    def feed(self, css):
+        css = _CSS_COMMENT_RE.sub('', css)
+        # 栈中每项为当前块的选择器列表（at 规则块为 ["@名称 参数"]）
+        stack = []
+        buffer = []
+        for match in _CSS_TOKEN_RE.finditer(css):
+            token = match.group()
+            if token == '{':
+                prelude = ''.join(buffer).strip()
+                buffer = []
+                stack.append(self._open_block(prelude, stack[-1] if stack else None))
+            elif token == ';':
+                self._statement(''.join(buffer).strip(), stack[-1] if stack else None)
+                buffer = []
+            elif token == '}':
+                self._statement(''.join(buffer).strip(), stack[-1] if stack else None)
+                buffer = []
+                if stack:
+                    stack.pop()
+            else:
+                buffer.append(token)
+
+    def _open_block(self, prelude, parent):
+        if prelude.startswith('@'):
+            name, _, params = prelude[1:].partition(' ')
+            params = params.strip()
+            self.at_rules.setdefault(name, []).append(params)
+            if name == "font-face":
+                self.font_faces.append({})
+            return [f"@{name} {params}".strip()]
+
+        if parent and parent[0].startswith('@keyframes'):
+            # 关键帧的 from / 50% 不是选择器
+            return [f"{parent[0]} {prelude}"]
+
+        selectors = split_selectors(prelude)
+        if parent and not parent[0].startswith('@'):
+            # CSS 嵌套：& 替换为父选择器，没有 & 的视为后代选择器
+            selectors = [selector.replace('&', outer) if '&' in selector else f"{outer} {selector}"
+                         for outer in parent for selector in selectors]
+        for selector in selectors:
+            for class_name in _CLASS_SELECTOR_RE.findall(selector):
+                self.class_selectors.setdefault(unescape_css_identifier(class_name), []).append(selector)
+        return selectors
+
+    def _statement(self, text, block):
+        if not text:
+            return
+        if text.startswith('@'):
+            # 不带块的 at 规则，如 @tailwind base; @import "x.css";
+            name, _, params = text[1:].partition(' ')
+            self.at_rules.setdefault(name, []).append(params.strip())
+            return
+        if block is None:
+            return
+        prop, colon, value = text.partition(':')
+        if not colon:
+            return
+        prop = prop.strip()
+        value = value.strip()
+        self.var_references.update(_VAR_RE.findall(value))
+        if block[0] == "@font-face":
+            # @font-face 不能嵌套，当前块总是最后一个
+            self.font_faces[-1][prop] = value
+        for selector in block:
+            self.rules.setdefault(selector, {})[prop] = value
+            if prop.startswith('--'):
+                self.custom_properties.setdefault(prop, []).append((selector, value))
+
+    def has_rule(self, selector):
+        return selector in self.rules
+
+    def defines(self, custom_property):
+        return custom_property in self.custom_properties
+
+    def uses_var(self, custom_property):
+        return custom_property in self.var_references
+
+    def has_at_rule(self, name, params=None):
+        if params is None:
+            return name in self.at_rules
+        return params in self.at_rules.get(name, ())
+
+    def defines_class(self, class_name):
+        return class_name in self.class_selectors
+
+def parse_css(css):
+    stylesheet = StylesheetIndex()
+    stylesheet.feed(css)
+    return stylesheet
+
+def unstyled_classes(document, stylesheet):
+    """页面用到、但样式表中没有任何规则的类名"""
+    return sorted(name for name in document.class_index if not stylesheet.defines_class(name))
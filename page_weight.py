@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+页面体积预算分析
+找出每个页面引用的图片、字体、CSS和JS（包括样式表里 @font-face 和 url() 引用的资源），
+并发用 HEAD 取大小（拿不到时改用 Range 请求），按路由和资源类型汇总字节数，
+标出非WebP图片和未子集化的字体，超出预算的路由使脚本以非零状态退出
+"""
+
+import re
+import sys
+import json
+import zlib
+import struct
+import asyncio
+import argparse
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from page_model import parse_css
+from site_verifier import SiteVerifier, add_arguments, page_assets, asset_type
+
+DEFAULT_BUDGET = "2MB"
+
+# 字形数超过该值视为未子集化（GB2312 全集约 7400 字，常用字子集一般在 3500 以内）
+MAX_FONT_GLYPHS = 5000
+
+# 读不到字形数的字体（如 woff2）按大小判断
+MAX_FONT_BYTES = 500 * 1024
+
+# 已是现代格式、不需要提示的图片类型
+MODERN_IMAGE_TYPES = {"image/webp", "image/avif", "image/svg+xml", "image/x-icon", "image/vnd.microsoft.icon"}
+MODERN_IMAGE_EXTENSIONS = {".webp", ".avif", ".svg", ".ico"}
+
+ASSET_KINDS = ("html", "css", "js", "image", "font", "other")
+
+# 读取字体表目录时一次取的字节数，足够容纳常见字体的全部表项
+FONT_HEADER_BYTES = 1024
+
+_CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+_SIZE_RE = re.compile(r'^\s*([\d.]+)\s*([KMG]?)B?\s*$', re.IGNORECASE)
+
+def parse_size(text):
+    """把 500KB、1.5MB、2048 这样的写法转换为字节数"""
+    match = _SIZE_RE.match(text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"无法识别的大小: {text}")
+    number, unit = match.groups()
+    return int(float(number) * 1024 ** " KMG".index(unit.upper() or " "))
+
+def format_size(size):
+    if size >= 1024 * 1024:
+        return f"{size / 1024 / 1024:.1f}MB"
+    if size >= 1024:
+        return f"{size / 1024:.1f}KB"
+    return f"{size}B"
+
+def stylesheet_assets(css_url, css_text):
+    """样式表引用的资源 {绝对地址: 类型}
+
+    @font-face 的 src 只取第一个 url()：浏览器按顺序选第一个支持的格式，后面的 woff 等只是后备。
+    字体只有页面用到时才会下载，这里按引用全部计入，结果是上限。
+    """
+    stylesheet = parse_css(css_text)
+    assets = {}
+    for face in stylesheet.font_faces:
+        match = _CSS_URL_RE.search(face.get("src", ""))
+        if match:
+            assets[match.group(2)] = "font"
+    for selector, declarations in stylesheet.rules.items():
+        if selector.startswith("@font-face"):
+            continue
+        for value in declarations.values():
+            for _, url in _CSS_URL_RE.findall(value):
+                assets.setdefault(url, asset_type(url))
+
+    return {urljoin(css_url, url): kind for url, kind in assets.items() if not url.startswith("data:")}
+
+class AssetInfo:
+    """一个资源的探测结果"""
+
+    def __init__(self, url, kind):
+        self.url = url
+        self.kind = kind
+        self.status = None
+        self.size = None
+        self.content_type = ""
+        self.glyphs = None
+        self.method = None
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.error is None and self.status is not None and self.status < 400 and self.size is not None
+
+    @property
+    def is_legacy_image(self):
+        """PNG/JPEG/GIF 等可以换成 WebP 的图片"""
+        if self.kind != "image":
+            return False
+        if self.content_type:
+            return self.content_type not in MODERN_IMAGE_TYPES
+        extension = urlparse(self.url).path.rsplit('.', 1)[-1].lower()
+        return f".{extension}" not in MODERN_IMAGE_EXTENSIONS
+
+    @property
+    def is_unsubset_font(self):
+        if self.kind != "font" or not self.ok:
+            return False
+        if self.glyphs is not None:
+            return self.glyphs > MAX_FONT_GLYPHS
+        return self.size > MAX_FONT_BYTES
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "status": self.status,
+            "bytes": self.size,
+            "content_type": self.content_type,
+            "glyphs": self.glyphs,
+            "method": self.method,
+            "error": self.error,
+        }
+
+class PageWeightAnalyzer(SiteVerifier):
+    """在站点验证器之上探测页面引用资源的大小
+
+    先发 HEAD 读 Content-Length；服务器不支持 HEAD 或没有给出长度时，
+    发 Range: bytes=0-0 从 Content-Range 读总长度，仍拿不到才完整下载计数。
+    同一资源在所有页面间只探测一次。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._asset_tasks = {}
+
+    def _read_range(self, url, start, length):
+        """读取 [start, start+length) 的字节；服务器忽略 Range 时从头读到需要的位置"""
+        headers = {"Range": f"bytes={start}-{start + length - 1}"}
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 206:
+                return response.raw.read(length)
+            if response.status_code == 200:
+                return response.raw.read(start + length)[start:]
+            return b""
+
+    def _probe_size(self, info):
+        response = self.session.head(info.url, timeout=self.timeout, allow_redirects=True)
+        info.status = response.status_code
+        info.content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if response.status_code < 400 and response.headers.get("Content-Length"):
+            info.size = int(response.headers["Content-Length"])
+            info.method = "HEAD"
+            return
+
+        with self.session.get(info.url, headers={"Range": "bytes=0-0"}, stream=True,
+                              timeout=self.timeout) as response:
+            info.status = 200 if response.status_code == 206 else response.status_code
+            info.content_type = info.content_type or \
+                response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            content_range = response.headers.get("Content-Range", "")
+            if response.status_code == 206 and "/" in content_range and not content_range.endswith("*"):
+                info.size = int(content_range.rsplit("/", 1)[1])
+                info.method = "Range"
+            elif response.status_code < 400:
+                info.size = sum(len(chunk) for chunk in response.raw.stream(64 * 1024, decode_content=False))
+                info.method = "GET"
+
+    def _font_glyphs(self, url):
+        """用 Range 请求读字体的表目录和 maxp 表，返回字形数；无法识别的格式返回 None
+
+        支持 TrueType/OpenType 和 WOFF；WOFF2 的表目录经过压缩变换，不在这里解析。
+        """
+        header = self._read_range(url, 0, FONT_HEADER_BYTES)
+        signature = header[:4]
+        if signature in (b"\x00\x01\x00\x00", b"OTTO", b"true"):
+            num_tables = struct.unpack(">H", header[4:6])[0]
+            for i in range(num_tables):
+                entry = header[12 + i * 16:28 + i * 16]
+                if len(entry) == 16 and entry[:4] == b"maxp":
+                    offset = struct.unpack(">I", entry[8:12])[0]
+                    maxp = self._read_range(url, offset, 6)
+                    return struct.unpack(">H", maxp[4:6])[0] if len(maxp) == 6 else None
+        elif signature == b"wOFF":
+            num_tables = struct.unpack(">H", header[12:14])[0]
+            for i in range(num_tables):
+                entry = header[44 + i * 20:64 + i * 20]
+                if len(entry) == 20 and entry[:4] == b"maxp":
+                    offset, comp_length, orig_length = struct.unpack(">III", entry[4:16])
+                    maxp = self._read_range(url, offset, comp_length)
+                    if comp_length < orig_length:
+                        maxp = zlib.decompress(maxp)
+                    return struct.unpack(">H", maxp[4:6])[0] if len(maxp) >= 6 else None
+        return None
+
+    def _probe(self, url, kind):
+        info = AssetInfo(url, kind)
+        try:
+            self._probe_size(info)
+            if info.ok and kind == "font":
+                info.glyphs = self._font_glyphs(url)
+        except (requests.RequestException, struct.error, zlib.error, ValueError) as e:
+            info.error = str(e)
+        return info
+
+    async def probe(self, url, kind):
+        async with self._semaphore:
+            return await asyncio.to_thread(self._probe, url, kind)
+
+    def probe_shared(self, url, kind):
+        """同一资源只探测一次，返回共享的任务"""
+        if url not in self._asset_tasks:
+            self._asset_tasks[url] = asyncio.ensure_future(self.probe(url, kind))
+        return self._asset_tasks[url]
+
+    async def analyze(self, routes=None):
+        """抓取页面后并发探测全部资源，返回 [(页面, {地址: AssetInfo})]"""
+        pages = await self.crawl(routes)
+        self._asset_tasks = {}
+        page_tasks = []
+        for page in pages:
+            if not page.ok:
+                page_tasks.append((page, {}))
+                continue
+            assets = page_assets(page)
+            for css_url, (status, css_text) in page.stylesheets.items():
+                if status == 200:
+                    for url, kind in stylesheet_assets(css_url, css_text).items():
+                        assets.setdefault(url, kind)
+            page_tasks.append((page, {url: self.probe_shared(url, kind) for url, kind in assets.items()}))
+
+        results = []
+        for page, tasks in page_tasks:
+            results.append((page, {url: await task for url, task in tasks.items()}))
+        return results
+
+def route_weight(page, assets):
+    """单个路由按资源类型汇总的字节数，html 为页面本身"""
+    weights = dict.fromkeys(ASSET_KINDS, 0)
+    weights["html"] = len(page.html.encode("utf-8"))
+    for info in assets.values():
+        if info.ok:
+            weights[info.kind if info.kind in weights else "other"] += info.size
+    return weights
+
+def check_budget(weights, budget, type_budgets):
+    """返回超出预算的项 [(名称, 实际字节, 预算字节)]"""
+    over = []
+    total = sum(weights.values())
+    if budget and total > budget:
+        over.append(("总计", total, budget))
+    for kind, limit in type_budgets.items():
+        if weights.get(kind, 0) > limit:
+            over.append((kind, weights[kind], limit))
+    return over
+
+def parse_type_budget(text):
+    kind, separator, size = text.partition("=")
+    if not separator or kind not in ASSET_KINDS:
+        raise argparse.ArgumentTypeError(f"格式应为 类型=大小，类型为 {'/'.join(ASSET_KINDS)}: {text}")
+    return kind, parse_size(size)
+
+def report_route(page, assets, budget, type_budgets):
+    """打印一个路由的体积报告，返回超出预算的项"""
+    print(f"\n📄 {page.route}  [{page.status or '无响应'}]")
+    if not page.ok:
+        print(f"❌ 页面访问失败: {page.error or page.status}")
+        return [("页面", 0, 0)]
+
+    weights = route_weight(page, assets)
+    total = sum(weights.values())
+    print(f"   📦 总计 {format_size(total)}" + (f" / 预算 {format_size(budget)}" if budget else ""))
+    for kind in ASSET_KINDS:
+        count = sum(1 for info in assets.values() if info.kind == kind)
+        if weights[kind] or count:
+            print(f"   • {kind}: {format_size(weights[kind])}" + (f" ({count} 个)" if kind != "html" else ""))
+
+    for info in sorted(assets.values(), key=lambda info: -(info.size or 0)):
+        if not info.ok:
+            print(f"   ❌ 无法获取: {info.url} ({info.error or info.status})")
+        elif info.is_legacy_image:
+            print(f"   ⚠️  非WebP图片: {info.url} ({info.content_type or '未知类型'}, {format_size(info.size)})")
+        elif info.is_unsubset_font:
+            glyphs = f"{info.glyphs} 个字形, " if info.glyphs is not None else ""
+            print(f"   ⚠️  字体未子集化: {info.url} ({glyphs}{format_size(info.size)})")
+
+    over = check_budget(weights, budget, type_budgets)
+    for name, actual, limit in over:
+        print(f"   ❌ 超出预算: {name} {format_size(actual)} > {format_size(limit)}")
+    if not over:
+        print("   ✅ 未超出预算")
+    return over
+
+def main():
+    parser = argparse.ArgumentParser(description="页面体积预算分析")
+    add_arguments(parser)
+    parser.add_argument("--budget", type=parse_size, default=parse_size(DEFAULT_BUDGET),
+                        help=f"每个路由的总字节预算，如 1.5MB，0 表示不限 (默认: {DEFAULT_BUDGET})")
+    parser.add_argument("--type-budget", type=parse_type_budget, action="append", default=[],
+                        metavar="TYPE=SIZE", help="单类资源的预算，如 image=500KB，可重复指定")
+    parser.add_argument("--output", help="把结果保存为JSON文件")
+    args = parser.parse_args()
+    type_budgets = dict(args.type_budget)
+
+    analyzer = PageWeightAnalyzer(args.base_url, args.app_dir, args.concurrency,
+                                  follow_links=not (args.no_follow or args.routes))
+    try:
+        results = asyncio.run(analyzer.analyze(args.routes))
+    finally:
+        analyzer.close()
+
+    probed = {url: info for _, assets in results for url, info in assets.items()}
+    print(f"🔍 {len(results)} 个页面, {len(probed)} 个资源")
+
+    failed = []
+    report = {"budget": args.budget, "type_budgets": type_budgets, "routes": {}, "assets": {}}
+    for page, assets in results:
+        over = report_route(page, assets, args.budget, type_budgets)
+        if over:
+            failed.append(page.route)
+        report["routes"][page.route] = {
+            "status": page.status,
+            "bytes": route_weight(page, assets) if page.ok else {},
+            "assets": list(assets),
+            "over_budget": [{"name": name, "bytes": actual, "budget": limit} for name, actual, limit in over],
+        }
+    report["assets"] = {url: info.to_dict() for url, info in probed.items()}
+
+    print("\n" + "=" * 60)
+    legacy_images = [info for info in probed.values() if info.ok and info.is_legacy_image]
+    unsubset_fonts = [info for info in probed.values() if info.is_unsubset_font]
+    if legacy_images:
+        saved = sum(info.size for info in legacy_images)
+        print(f"⚠️  {len(legacy_images)} 张非WebP图片 ({format_size(saved)})，可运行 optimize-images.js 转换")
+    if unsubset_fonts:
+        print(f"⚠️  {len(unsubset_fonts)} 个字体未子集化 "
+              f"({format_size(sum(info.size for info in unsubset_fonts))})，建议按页面用字生成子集并转为 woff2")
+    print(f"📊 {len(results) - len(failed)}/{len(results)} 个路由在预算内")
+    for route in failed:
+        print(f"   ❌ {route}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存: {args.output}")
+
+    sys.exit(1 if failed or not results else 0)
+
+if __name__ == "__main__":
+    main()
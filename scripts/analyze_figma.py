@@ -1,12 +1,288 @@
 #!/usr/bin/env python3
+import re
 import json
+import codecs
 import struct
 import zipfile
+import hashlib
+import argparse
 import os
-from typing import Dict, Any
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, Tuple, BinaryIO, List, Optional
 
-def parse_figma_file(fig_path: str) -> Dict[str, Any]:
-    """解析Figma文件并提取设计信息"""
+try:
+    import ijson  # 可选：C实现的增量JSON解析
+except ImportError:
+    ijson = None
+
+# 解析失败时可以跳过该文件、继续尝试下一个的异常类型
+JSON_ERRORS: Tuple[type, ...] = (ValueError,) + ((ijson.JSONError,) if ijson else ())
+
+_JSON_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<punct>[{}\[\]:,])
+      | (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<number>-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?)
+      | (?P<literal>true|false|null)
+    )''', re.VERBOSE | re.DOTALL)
+
+# 词法单元离缓冲区末尾少于该字符数时先补充数据再切分
+_TOKEN_MARGIN = 32
+
+_LITERALS = {'true': ('boolean', True), 'false': ('boolean', False), 'null': ('null', None)}
+
+def _iter_json_tokens(fp: BinaryIO, chunk_size: int = 65536) -> Iterator[Tuple[str, str]]:
+    """从二进制流中分块读取并切分JSON词法单元，内存只保留当前块"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    eof = False
+    while True:
+        match = _JSON_TOKEN_RE.match(buf, pos)
+        # 没有匹配或匹配靠近缓冲区末尾时，单元可能被分块截断（如数字 "0." 被切成 "0"），需要继续读取
+        if match is None or (not eof and match.end() > len(buf) - _TOKEN_MARGIN):
+            if eof:
+                if buf[pos:].strip():
+                    raise ValueError(f"无效的JSON内容: {buf[pos:pos + 40]!r}")
+                return
+            chunk = fp.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + decoder.decode(chunk, final=eof)
+            pos = 0
+            continue
+        pos = match.end()
+        yield match.lastgroup, match.group(match.lastgroup)
+
+def _basic_parse(fp: BinaryIO) -> Iterator[Tuple[str, Any]]:
+    """纯Python的事件式JSON解析，事件格式与 ijson.basic_parse 相同"""
+    stack = []
+    expect_key = False
+    for kind, text in _iter_json_tokens(fp):
+        if kind == 'punct':
+            if text == '{':
+                stack.append('map')
+                expect_key = True
+                yield 'start_map', None
+            elif text == '[':
+                stack.append('array')
+                yield 'start_array', None
+            elif text in '}]':
+                expected = 'map' if text == '}' else 'array'
+                if not stack or stack.pop() != expected:
+                    raise ValueError(f"JSON括号不匹配: {text}")
+                expect_key = False
+                yield ('end_map' if text == '}' else 'end_array'), None
+            elif text == ',':
+                expect_key = bool(stack) and stack[-1] == 'map'
+        elif kind == 'string':
+            value = json.loads(text) if '\\' in text else text[1:-1]
+            if expect_key:
+                expect_key = False
+                yield 'map_key', value
+            else:
+                yield 'string', value
+        elif kind == 'number':
+            is_int = not any(c in text for c in '.eE')
+            yield 'number', int(text) if is_int else float(text)
+        else:
+            yield _LITERALS[text]
+    if stack:
+        raise ValueError("JSON内容意外结束")
+
+def basic_parse(fp: BinaryIO) -> Iterator[Tuple[str, Any]]:
+    """事件式解析JSON流：优先使用 ijson，未安装时退回纯Python实现"""
+    if ijson is not None:
+        return ijson.basic_parse(fp, use_float=True)
+    return _basic_parse(fp)
+
+def _next_event(events: Iterator[Tuple[str, Any]]) -> Tuple[str, Any]:
+    """读取下一个事件，流提前结束时抛出 ValueError"""
+    try:
+        return next(events)
+    except StopIteration:
+        raise ValueError("JSON内容意外结束") from None
+
+def _read_value(event: str, value: Any, events: Iterator[Tuple[str, Any]]) -> Any:
+    """把一个完整的JSON值（节点属性，如fills、style）组装为Python对象"""
+    if event == 'start_map':
+        obj = {}
+        while True:
+            event, key = _next_event(events)
+            if event == 'end_map':
+                return obj
+            obj[key] = _read_value(*_next_event(events), events)
+    if event == 'start_array':
+        arr = []
+        while True:
+            event, value = _next_event(events)
+            if event == 'end_array':
+                return arr
+            arr.append(_read_value(event, value, events))
+    return value
+
+def _skip_value(event: str, events: Iterator[Tuple[str, Any]]) -> None:
+    """跳过一个JSON值，不构建任何对象"""
+    depth = 1 if event in ('start_map', 'start_array') else 0
+    while depth:
+        event, _ = _next_event(events)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+
+def iter_figma_nodes(fp: BinaryIO) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+    """流式遍历 document 节点树，产出 (节点, 序号, 父节点序号)
+
+    节点不包含 children 字段，子节点在其父节点之前产出（节点的属性可能
+    写在 children 之后，必须等对象结束才完整）；序号按节点开始出现的先后
+    （先序）分配，根节点为0、父序号为-1，与 iter_document_nodes 一致，
+    需要文档顺序的地方按序号排序。
+    内存占用只与树的深度有关，与文档大小无关。
+    """
+    events = iter(basic_parse(fp))
+    event, _ = _next_event(events)
+    if event != 'start_map':
+        raise ValueError("Figma数据不是JSON对象")
+
+    while True:
+        event, key = _next_event(events)
+        if event == 'end_map':
+            return
+        event, value = _next_event(events)
+        if key != 'document' or event != 'start_map':
+            _skip_value(event, events)
+            continue
+
+        # 栈帧: ['node', 节点, 序号, 父序号] 或 ['children', 父序号]
+        stack = [['node', {}, 0, -1]]
+        next_seq = 1
+        while stack:
+            frame = stack[-1]
+            event, value = _next_event(events)
+            if frame[0] == 'children':
+                if event == 'end_array':
+                    stack.pop()
+                elif event == 'start_map':
+                    stack.append(['node', {}, next_seq, frame[1]])
+                    next_seq += 1
+                else:
+                    _skip_value(event, events)
+                continue
+
+            _, node, node_seq, parent_seq = frame
+            if event == 'end_map':
+                stack.pop()
+                yield node, node_seq, parent_seq
+                continue
+            field_event, field_value = _next_event(events)
+            if value == 'children' and field_event == 'start_array':
+                stack.append(['children', node_seq])
+            else:
+                node[value] = _read_value(field_event, field_value, events)
+
+def iter_document_nodes(document: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+    """用显式栈先序遍历内存中的节点树，产出 (节点, 序号, 父节点序号)
+
+    与 iter_figma_nodes 的产出格式一致，不受递归深度限制。
+    """
+    stack = [(document, -1)]
+    seq = 0
+    while stack:
+        node, parent_seq = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        yield node, seq, parent_seq
+        children = node.get('children')
+        if children:
+            # 逆序入栈，保证出栈顺序与原文档顺序一致
+            stack.extend((child, seq) for child in reversed(children))
+        seq += 1
+
+class NodeIndex:
+    """紧凑的节点索引
+
+    按先序序号把 id、类型、名称、父节点、样式引用和填充色存放在并行数组中，
+    子树对应一段连续的序号区间，因此"某个节点下的所有X"只需切片，无需再遍历节点树。
+    """
+
+    __slots__ = ('ids', 'types', 'names', 'parents', 'style_refs', 'fills', '_ends', '_by_id')
+
+    def __init__(self):
+        self.ids: List[Optional[str]] = []
+        self.types: List[Optional[str]] = []
+        self.names: List[Optional[str]] = []
+        self.parents = array('l')
+        self.style_refs: List[Optional[Dict[str, str]]] = []
+        self.fills: List[Optional[Tuple[str, ...]]] = []
+        self._ends: Optional[array] = None
+        self._by_id: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def clear(self) -> None:
+        """清空索引"""
+        self.__init__()
+
+    def add(self, seq: int, node: Dict[str, Any], parent_seq: int) -> None:
+        """登记一个节点；流式解析时节点按后序到达，所以按序号定位写入"""
+        while len(self.ids) <= seq:
+            self.ids.append(None)
+            self.types.append(None)
+            self.names.append(None)
+            self.parents.append(-1)
+            self.style_refs.append(None)
+            self.fills.append(None)
+        self.ids[seq] = node.get('id')
+        self.types[seq] = node.get('type')
+        self.names[seq] = node.get('name')
+        self.parents[seq] = parent_seq
+        self.style_refs[seq] = node.get('styles') or None
+        self.fills[seq] = tuple(_node_fill_colors(node)) or None
+        self._ends = None
+        self._by_id = None
+
+    def _finalize(self) -> None:
+        """计算每个节点子树的结束序号和 id 查找表"""
+        if self._ends is not None:
+            return
+        ends = array('l', range(1, len(self.ids) + 1))
+        # 先序编号下子节点序号总大于父节点，逆序一次即可向上传递子树边界
+        for seq in range(len(self.ids) - 1, 0, -1):
+            parent = self.parents[seq]
+            if parent >= 0 and ends[seq] > ends[parent]:
+                ends[parent] = ends[seq]
+        self._ends = ends
+        self._by_id = {node_id: seq for seq, node_id in enumerate(self.ids) if node_id is not None}
+
+    def subtree(self, node_id: str) -> range:
+        """节点及其所有后代的序号区间，节点不存在时为空区间"""
+        self._finalize()
+        seq = self._by_id.get(node_id)
+        if seq is None:
+            return range(0)
+        return range(seq, self._ends[seq])
+
+    def nodes_of_type(self, node_type: str, under: Optional[str] = None) -> List[str]:
+        """指定类型的节点 id，可限定在某个节点之下"""
+        seqs = self.subtree(under) if under else range(len(self.ids))
+        return [self.ids[seq] for seq in seqs if self.types[seq] == node_type]
+
+    def text_nodes(self, under: Optional[str] = None) -> List[str]:
+        """所有文本节点 id"""
+        return self.nodes_of_type('TEXT', under)
+
+    def fills_under(self, node_id: str) -> Dict[str, Tuple[str, ...]]:
+        """某个节点（含自身）之下所有带填充色的节点及其颜色"""
+        return {self.ids[seq]: self.fills[seq] for seq in self.subtree(node_id) if self.fills[seq]}
+
+    def style_refs_under(self, node_id: str) -> Dict[str, Dict[str, str]]:
+        """某个节点（含自身）之下所有引用了共享样式的节点"""
+        return {self.ids[seq]: self.style_refs[seq] for seq in self.subtree(node_id) if self.style_refs[seq]}
+
+def parse_figma_file(fig_path: str, index: Optional[NodeIndex] = None) -> Dict[str, Any]:
+    """解析Figma文件并提取设计信息，传入 index 时同时建立节点索引"""
     try:
         # Figma文件实际上是zip压缩包
         with zipfile.ZipFile(fig_path, 'r') as zip_ref:
@@ -16,95 +292,405 @@ def parse_figma_file(fig_path: str) -> Dict[str, Any]:
             for file in file_list:
                 print(f"  - {file}")
             
-            # 查找主要的JSON文件
-            main_json = None
+            # 查找主要的JSON文件，直接从压缩流中增量解析
             for file in file_list:
                 if file == 'canvas.json' or file.endswith('.json'):
                     with zip_ref.open(file) as f:
-                        content = f.read().decode('utf-8')
                         try:
-                            data = json.loads(content)
-                            main_json = data
+                            design_info = stream_design_info(f, index)
                             print(f"成功解析: {file}")
-                            break
-                        except json.JSONDecodeError:
+                            return design_info
+                        except JSON_ERRORS:
+                            if index is not None:
+                                index.clear()
                             continue
-            
-            if main_json:
-                return extract_design_info(main_json)
-            else:
-                print("未找到有效的JSON数据")
-                return {}
+
+            print("未找到有效的JSON数据")
+            return {}
                 
     except Exception as e:
         print(f"解析Figma文件时出错: {e}")
         return {}
 
-def extract_design_info(data: Dict[str, Any]) -> Dict[str, Any]:
-    """从Figma数据中提取设计信息"""
-    design_info = {
+# 排版令牌由这些字段组成的元组去重
+TYPOGRAPHY_FIELDS = ('fontFamily', 'fontWeight', 'fontSize', 'lineHeightPx', 'letterSpacing', 'italic')
+SPACING_KEYS = ('itemSpacing', 'counterAxisSpacing', 'paddingLeft', 'paddingRight', 'paddingTop', 'paddingBottom')
+
+class TokenTable:
+    """设计令牌表：相同的值只保存一次，并记录使用次数和引用它的节点
+
+    节点引用连同节点序号一起保存，导出时按序号（文档先序）排列，
+    所以流式解析和整体加载两条路径得到的引用顺序一致。
+    """
+
+    __slots__ = ('fields', 'values', 'counts', 'nodes', 'positions', '_ids')
+
+    def __init__(self, fields: Optional[Tuple[str, ...]] = None):
+        self.fields = fields
+        self.values: List[Any] = []
+        self.counts = array('l')
+        self.nodes: List[List[str]] = []
+        self.positions: List[array] = []
+        self._ids: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: Any, node_id: Optional[str] = None, count: int = 1, seq: int = -1) -> int:
+        """登记一次使用，返回令牌编号；seq 为引用节点的先序序号"""
+        token_id = self._ids.get(value)
+        if token_id is None:
+            token_id = self._ids[value] = len(self.values)
+            self.values.append(value)
+            self.counts.append(0)
+            self.nodes.append([])
+            self.positions.append(array('l'))
+        self.counts[token_id] += count
+        if node_id is not None:
+            self.nodes[token_id].append(node_id)
+            self.positions[token_id].append(seq)
+        return token_id
+
+    def ordered_nodes(self, token_id: int) -> List[str]:
+        """引用该令牌的节点，按文档先序排列"""
+        positions = self.positions[token_id]
+        nodes = self.nodes[token_id]
+        return [nodes[i] for i in sorted(range(len(nodes)), key=positions.__getitem__)]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """按使用次数从多到少导出为可序列化的列表"""
+        order = sorted(range(len(self.values)), key=lambda i: (-self.counts[i], str(self.values[i])))
+        return [{
+            'value': dict(zip(self.fields, self.values[i])) if self.fields else self.values[i],
+            'count': self.counts[i],
+            'nodes': self.ordered_nodes(i),
+        } for i in order]
+
+def new_design_info() -> Dict[str, Any]:
+    """创建空的设计信息结构"""
+    return {
         'colors': set(),
         'fonts': set(),
         'components': [],
-        'styles': {}
+        'styles': {'fontSize': set(), 'fontWeight': set()},
+        'tokens': {
+            'colors': TokenTable(),
+            'typography': TokenTable(TYPOGRAPHY_FIELDS),
+            'spacing': TokenTable(),
+            'radius': TokenTable(),
+        }
     }
-    
-    def traverse_node(node):
-        if isinstance(node, dict):
-            # 提取颜色信息
-            if 'fills' in node:
-                for fill in node['fills']:
-                    if 'color' in fill:
-                        color = fill['color']
-                        # 将RGBA转换为十六进制
-                        if color:
-                            r = int(color.get('r', 0) * 255)
-                            g = int(color.get('g', 0) * 255)
-                            b = int(color.get('b', 0) * 255)
-                            a = color.get('a', 1)
-                            hex_color = f"#{r:02x}{g:02x}{b:02x}"
-                            design_info['colors'].add(hex_color)
-            
-            # 提取字体信息
-            if 'style' in node:
-                style = node['style']
-                if 'fontFamily' in style:
-                    design_info['fonts'].add(style['fontFamily'])
-                if 'fontSize' in style:
-                    design_info['styles']['fontSize'] = style['fontSize']
-                if 'fontWeight' in style:
-                    design_info['styles']['fontWeight'] = style['fontWeight']
-            
-            # 递归遍历子节点
-            if 'children' in node:
-                for child in node['children']:
-                    traverse_node(child)
-    
-    if 'document' in data:
-        traverse_node(data['document'])
-    
+
+def _color_hex(paint: Dict[str, Any]) -> Optional[str]:
+    """把填充/描边的颜色转换为十六进制，不透明度小于1时带上alpha"""
+    color = paint.get('color')
+    if not color or paint.get('visible', True) is False:
+        return None
+    r = round(color.get('r', 0) * 255)
+    g = round(color.get('g', 0) * 255)
+    b = round(color.get('b', 0) * 255)
+    a = round(color.get('a', 1) * paint.get('opacity', 1) * 255)
+    if a >= 255:
+        return f"#{r:02x}{g:02x}{b:02x}"
+    return f"#{r:02x}{g:02x}{b:02x}{a:02x}"
+
+def _node_fill_colors(node: Dict[str, Any]) -> Iterator[str]:
+    """节点填充色的十六进制表示"""
+    for fill in node.get('fills') or ():
+        hex_color = _color_hex(fill)
+        if hex_color:
+            yield hex_color
+
+def collect_node(design_info: Dict[str, Any], node: Dict[str, Any], seq: int = -1) -> None:
+    """从单个节点收集颜色、排版、间距和圆角令牌（不处理子节点），seq 为节点的先序序号"""
+    tokens = design_info['tokens']
+    node_id = node.get('id')
+
+    # 提取颜色信息（填充和描边）
+    for key in ('fills', 'strokes'):
+        for paint in node.get(key) or ():
+            hex_color = _color_hex(paint)
+            if hex_color:
+                tokens['colors'].intern(hex_color, node_id, seq=seq)
+                design_info['colors'].add(hex_color)
+
+    # 提取字体信息
+    style = node.get('style')
+    if style:
+        typography = tuple(style.get(field) for field in TYPOGRAPHY_FIELDS)
+        if any(value is not None for value in typography):
+            tokens['typography'].intern(typography, node_id, seq=seq)
+        if 'fontFamily' in style:
+            design_info['fonts'].add(style['fontFamily'])
+        if 'fontSize' in style:
+            design_info['styles']['fontSize'].add(style['fontSize'])
+        if 'fontWeight' in style:
+            design_info['styles']['fontWeight'].add(style['fontWeight'])
+
+    # 提取间距和圆角
+    for key in SPACING_KEYS:
+        value = node.get(key)
+        if value:
+            tokens['spacing'].intern(value, node_id, seq=seq)
+    radii = set(node.get('rectangleCornerRadii') or ())
+    if node.get('cornerRadius'):
+        radii.add(node['cornerRadius'])
+    for value in radii:
+        if value:
+            tokens['radius'].intern(value, node_id, seq=seq)
+
+def design_info_to_json(design_info: Dict[str, Any]) -> Dict[str, Any]:
+    """转换为可直接 json.dump 的结构"""
+    return {
+        'colors': sorted(design_info['colors']),
+        'fonts': sorted(design_info['fonts']),
+        'components': design_info['components'],
+        'styles': {key: sorted(values) for key, values in design_info['styles'].items()},
+        'tokens': {kind: table.to_list() for kind, table in design_info['tokens'].items()},
+    }
+
+def _collect_nodes(nodes: Iterator[Tuple[Dict[str, Any], int, int]],
+                   index: Optional[NodeIndex]) -> Dict[str, Any]:
+    """一次遍历同时收集设计信息和建立节点索引"""
+    design_info = new_design_info()
+    for node, seq, parent_seq in nodes:
+        collect_node(design_info, node, seq)
+        if index is not None:
+            index.add(seq, node, parent_seq)
     return design_info
 
+def stream_design_info(fp: BinaryIO, index: Optional[NodeIndex] = None) -> Dict[str, Any]:
+    """边解析边收集设计信息，不把整个JSON读入内存"""
+    return _collect_nodes(iter_figma_nodes(fp), index)
+
+def extract_design_info(data: Dict[str, Any], index: Optional[NodeIndex] = None) -> Dict[str, Any]:
+    """从Figma数据中提取设计信息，传入 index 时同时建立节点索引"""
+    if 'document' not in data:
+        return new_design_info()
+    return _collect_nodes(iter_document_nodes(data['document']), index)
+
+# 压缩包中按图片资源处理的成员
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg')
+
+def _is_image_member(name: str) -> bool:
+    """判断压缩包成员是否为图片资源（Figma的 images/ 目录下文件没有扩展名）"""
+    return name.startswith('images/') or name.lower().endswith(IMAGE_EXTENSIONS)
+
+def analyze_member(fig_path: str, member_name: str) -> Dict[str, Any]:
+    """流式解析压缩包中的一个JSON成员，返回可序列化的提取结果（供进程池调用）"""
+    with zipfile.ZipFile(fig_path, 'r') as zip_ref:
+        with zip_ref.open(member_name) as f:
+            return design_info_to_json(stream_design_info(f))
+
+def merge_design_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """合并多个成员（页面）的提取结果，相同令牌的次数相加、节点引用拼接"""
+    merged = {'colors': set(), 'fonts': set(), 'components': [], 'styles': {}, 'tokens': {}}
+    token_maps: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for result in results:
+        merged['colors'].update(result['colors'])
+        merged['fonts'].update(result['fonts'])
+        merged['components'].extend(result['components'])
+        for key, values in result['styles'].items():
+            merged['styles'].setdefault(key, set()).update(values)
+        for kind, tokens in result['tokens'].items():
+            table = token_maps.setdefault(kind, {})
+            for token in tokens:
+                key = json.dumps(token['value'], sort_keys=True, ensure_ascii=False)
+                entry = table.get(key)
+                if entry is None:
+                    table[key] = {'value': token['value'], 'count': token['count'], 'nodes': list(token['nodes'])}
+                else:
+                    entry['count'] += token['count']
+                    entry['nodes'].extend(token['nodes'])
+
+    return {
+        'colors': sorted(merged['colors']),
+        'fonts': sorted(merged['fonts']),
+        'components': merged['components'],
+        'styles': {key: sorted(values) for key, values in merged['styles'].items()},
+        'tokens': {kind: sorted(table.values(), key=lambda t: -t['count']) for kind, table in token_maps.items()},
+    }
+
+def _hash_member(zip_ref: zipfile.ZipFile, name: str) -> str:
+    """流式计算成员内容的SHA-256（需要解压）"""
+    digest = hashlib.sha256()
+    with zip_ref.open(name) as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# 分析缓存：按成员名和CRC32保存每个成员的提取结果
+CACHE_VERSION = 2
+
+def default_cache_path(fig_path: str) -> str:
+    """缓存文件默认放在Figma文件旁边"""
+    return fig_path + '.analysis-cache.json'
+
+def load_analysis_cache(cache_path: str) -> Dict[str, Any]:
+    """读取分析缓存，不存在或版本不符时返回空缓存"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {'version': CACHE_VERSION, 'members': {}}
+
+def save_analysis_cache(cache_path: str, cache: Dict[str, Any]) -> None:
+    """原子写入分析缓存"""
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+def analyze_archive(fig_path: str, workers: Optional[int] = None, hash_assets: bool = False,
+                    cache_path: Optional[str] = None) -> Dict[str, Any]:
+    """分析压缩包中的全部成员
+
+    所有JSON成员（页面/画布）在进程池中并行流式解析后合并令牌；
+    图片资源只读取目录信息（大小、CRC32），hash_assets 为True时才解压计算SHA-256。
+    指定 cache_path 时，成员名、CRC32和大小都未变的成员直接复用缓存结果，
+    只重新解析发生变化的成员，再由各成员结果重新合并。
+    """
+    cache = load_analysis_cache(cache_path) if cache_path else {'version': CACHE_VERSION, 'members': {}}
+    fresh_cache: Dict[str, Any] = {'version': CACHE_VERSION, 'members': {}}
+
+    with zipfile.ZipFile(fig_path, 'r') as zip_ref:
+        infos = zip_ref.infolist()
+        json_infos = [info for info in infos if info.filename.endswith('.json')]
+
+        assets = []
+        for info in infos:
+            if info.is_dir() or not _is_image_member(info.filename):
+                continue
+            asset = {
+                'name': info.filename,
+                'size': info.file_size,
+                'compressed_size': info.compress_size,
+                'crc32': f"{info.CRC:08x}",
+            }
+            if hash_assets:
+                asset['sha256'] = _hash_member(zip_ref, info.filename)
+            assets.append(asset)
+        assets.sort(key=lambda asset: -asset['size'])
+
+        members = [{'name': info.filename, 'size': info.file_size, 'compressed_size': info.compress_size}
+                   for info in infos if not info.is_dir()]
+
+    pages: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    changed = []
+    for info in json_infos:
+        key = {'crc32': f"{info.CRC:08x}", 'size': info.file_size}
+        entry = cache['members'].get(info.filename)
+        if entry and entry.get('crc32') == key['crc32'] and entry.get('size') == key['size']:
+            fresh_cache['members'][info.filename] = entry
+            if 'error' in entry:
+                errors[info.filename] = entry['error']
+            else:
+                pages[info.filename] = entry['result']
+        else:
+            changed.append((info.filename, key))
+
+    if cache_path:
+        print(f"缓存命中 {len(json_infos) - len(changed)} 个成员，需要重新解析 {len(changed)} 个")
+
+    if changed:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(name, key, executor.submit(analyze_member, fig_path, name)) for name, key in changed]
+            for name, key, future in futures:
+                try:
+                    pages[name] = future.result()
+                    fresh_cache['members'][name] = {**key, 'result': pages[name]}
+                    print(f"成功解析: {name}")
+                except JSON_ERRORS as e:
+                    errors[name] = str(e)
+                    fresh_cache['members'][name] = {**key, 'error': str(e)}
+                    print(f"跳过无法解析的成员: {name}")
+
+    # 已从压缩包中删除的成员不再写回缓存
+    if cache_path:
+        save_analysis_cache(cache_path, fresh_cache)
+
+    # 按压缩包内的顺序排列页面结果
+    pages = {info.filename: pages[info.filename] for info in json_infos if info.filename in pages}
+    return {
+        'members': members,
+        'pages': pages,
+        'errors': errors,
+        'assets': assets,
+        'cache': {'hits': len(json_infos) - len(changed), 'parsed': len(changed)},
+        'merged': merge_design_results(list(pages.values())),
+    }
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="分析Figma文件并提取设计令牌")
+    parser.add_argument("fig_path", nargs="?", default="/Users/d1/Downloads/Untitled.fig", help="Figma文件路径")
+    parser.add_argument("--all-members", action="store_true",
+                        help="分析压缩包中的全部JSON成员并合并结果，同时列出图片资源")
+    parser.add_argument("--workers", type=int, default=None, help="并行解析的进程数 (默认: CPU核数)")
+    parser.add_argument("--hash-assets", action="store_true", help="解压图片资源并计算SHA-256")
+    parser.add_argument("--output", default="/tmp/figma_analysis.json", help="结果输出路径")
+    parser.add_argument("--cache", default=None,
+                        help="全压缩包模式的分析缓存路径 (默认: <fig_path>.analysis-cache.json)")
+    parser.add_argument("--no-cache", action="store_true", help="不读取也不写入分析缓存")
+    return parser.parse_args(argv)
+
+def main_archive(args) -> None:
+    """全压缩包分析模式"""
+    cache_path = None if args.no_cache else (args.cache or default_cache_path(args.fig_path))
+    result = analyze_archive(args.fig_path, workers=args.workers, hash_assets=args.hash_assets,
+                             cache_path=cache_path)
+    merged = result['merged']
+
+    print("\n=== 全部成员分析结果 ===")
+    print(f"成员数量: {len(result['members'])}，解析页面: {len(result['pages'])}，失败: {len(result['errors'])}")
+    print(f"发现颜色: {merged['colors']}")
+    print(f"发现字体: {merged['fonts']}")
+    for kind, tokens in merged['tokens'].items():
+        print(f"{kind} 令牌: {len(tokens)} 个")
+    total_asset_size = sum(asset['size'] for asset in result['assets'])
+    print(f"图片资源: {len(result['assets'])} 个，共 {total_asset_size:,} 字节")
+    for asset in result['assets'][:10]:
+        print(f"  - {asset['name']} ({asset['size']:,} 字节, crc32 {asset['crc32']})")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    print(f"\n分析结果已保存到: {args.output}")
+
 def main():
-    fig_path = "/Users/d1/Downloads/Untitled.fig"
+    args = parse_args()
+    fig_path = args.fig_path
     
     if not os.path.exists(fig_path):
         print(f"Figma文件不存在: {fig_path}")
         return
     
     print(f"开始分析Figma文件: {fig_path}")
+    if args.all_members:
+        main_archive(args)
+        return
+
     design_info = parse_figma_file(fig_path)
     
+    if not design_info:
+        return
+
     print("\n=== 设计信息提取结果 ===")
-    print(f"发现颜色: {list(design_info['colors'])}")
-    print(f"发现字体: {list(design_info['fonts'])}")
-    print(f"样式信息: {design_info['styles']}")
-    
+    print(f"发现颜色: {sorted(design_info['colors'])}")
+    print(f"发现字体: {sorted(design_info['fonts'])}")
+    print(f"样式信息: { {key: sorted(values) for key, values in design_info['styles'].items()} }")
+    for kind, table in design_info['tokens'].items():
+        print(f"{kind} 令牌: {len(table)} 个")
+
     # 保存结果到文件
-    with open('/tmp/figma_analysis.json', 'w', encoding='utf-8') as f:
-        json.dump(design_info, f, indent=2, ensure_ascii=False, default=list)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(design_info_to_json(design_info), f, indent=2, ensure_ascii=False)
     
-    print(f"\n分析结果已保存到: /tmp/figma_analysis.json")
+    print(f"\n分析结果已保存到: {args.output}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+PDF批量处理脚本
+对目录或通配符匹配到的所有PDF并发执行页面转换和/或图片提取
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import contextlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+# 默认路径
+DEFAULT_INPUT = "docs/pdfs"
+DEFAULT_OUTPUT_DIR = "public/pdf-images"
+
+
+def find_pdf_files(pattern):
+    """把目录或通配符展开为排好序的PDF文件列表"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.pdf')
+    return sorted(path for path in glob.glob(pattern, recursive=True)
+                  if path.lower().endswith('.pdf') and os.path.isfile(path))
+
+
+def _process_pdf(pdf_path, output_dir, mode, options, verbose):
+    """在子进程中处理单个PDF，返回统计信息"""
+    result = {'pages': 0, 'bytes_out': 0}
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            devnull = stack.enter_context(open(os.devnull, 'w'))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+
+        if mode in ('render', 'both'):
+            from convert_pdf_to_images import convert_pdf_pages_to_images
+            render_dir = output_dir if mode == 'render' else os.path.join(output_dir, 'pages')
+            stats = convert_pdf_pages_to_images(pdf_path, render_dir, dpi=options['dpi'],
+                                                ladder=options['ladder'])
+            if stats['error']:
+                raise RuntimeError(f"页面转换失败: {stats['error']}")
+            result['pages'] = stats['pages'] + stats['skipped']
+            result['bytes_out'] += stats['bytes_written']
+
+        if mode in ('extract', 'both'):
+            from extract_pdf_images import extract_images_from_pdf
+            extract_dir = output_dir if mode == 'extract' else os.path.join(output_dir, 'images')
+            stats = extract_images_from_pdf(pdf_path, extract_dir, low_memory=options['low_memory'])
+            if stats['error']:
+                raise RuntimeError(f"图片提取失败: {stats['error']}")
+            result['pages'] = max(result['pages'], stats['pages'])
+            result['bytes_out'] += stats['bytes_written']
+    return result
+
+
+def _job_entry(conn, pdf_path, output_dir, mode, options, verbose):
+    """子进程入口：把结果或异常通过管道发回父进程"""
+    try:
+        conn.send(('ok', _process_pdf(pdf_path, output_dir, mode, options, verbose)))
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_pdf_job(pdf_path, output_dir, mode, options, timeout, verbose=False):
+    """在独立进程中处理一个PDF，超时则终止该进程
+
+    每个文件一个进程，崩溃或超时只影响该文件本身。
+    """
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_job_entry,
+                          args=(child_conn, pdf_path, output_dir, mode, options, verbose))
+
+    start_time = time.perf_counter()
+    process.start()
+    child_conn.close()
+
+    outcome = {'file': pdf_path, 'status': 'ok', 'error': None, 'pages': 0,
+               'bytes_in': os.path.getsize(pdf_path), 'bytes_out': 0}
+    try:
+        if parent_conn.poll(timeout):
+            status, payload = parent_conn.recv()
+            if status == 'ok':
+                outcome.update(payload)
+            else:
+                outcome.update(status='failed', error=payload)
+        else:
+            outcome.update(status='timeout', error=f"超过 {timeout} 秒")
+    except EOFError:
+        outcome.update(status='failed', error=f"子进程异常退出 (exit code {process.exitcode})")
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        parent_conn.close()
+
+    outcome['elapsed'] = time.perf_counter() - start_time
+    return outcome
+
+
+def batch_convert(pdf_files, output_root, mode='render', workers=4, timeout=600, options=None,
+                  verbose=False):
+    """并发处理多个PDF，返回每个文件的结果和汇总报告"""
+    options = {'dpi': 150, 'ladder': None, 'low_memory': False, **(options or {})}
+    start_time = time.perf_counter()
+    results = []
+
+    def job(pdf_path):
+        stem = os.path.splitext(os.path.basename(pdf_path))[0]
+        return run_pdf_job(pdf_path, os.path.join(output_root, stem), mode, options, timeout, verbose)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for outcome in executor.map(job, pdf_files):
+            icon = "✅" if outcome['status'] == 'ok' else "❌"
+            detail = f"{outcome['pages']} 页" if outcome['status'] == 'ok' else outcome['error']
+            print(f"{icon} {os.path.basename(outcome['file'])}: {detail} ({outcome['elapsed']:.1f}秒)")
+            results.append(outcome)
+
+    wall_time = time.perf_counter() - start_time
+    succeeded = [r for r in results if r['status'] == 'ok']
+    summary = {
+        'files': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'pages': sum(r['pages'] for r in succeeded),
+        'bytes_in': sum(r['bytes_in'] for r in results),
+        'bytes_out': sum(r['bytes_out'] for r in succeeded),
+        'wall_time': wall_time,
+    }
+    summary['files_per_sec'] = summary['files'] / wall_time if wall_time > 0 else 0.0
+    summary['pages_per_sec'] = summary['pages'] / wall_time if wall_time > 0 else 0.0
+    return results, summary
+
+
+def print_summary(summary):
+    """打印汇总吞吐报告"""
+    print("\n" + "=" * 50)
+    print("📊 批量处理汇总:")
+    print(f"   • 文件: {summary['files']} 个 (成功 {summary['succeeded']}, 失败 {summary['failed']})")
+    print(f"   • 页面: {summary['pages']} 页")
+    print(f"   • 输入: {summary['bytes_in'] / 1024 / 1024:.1f} MB")
+    print(f"   • 输出: {summary['bytes_out'] / 1024 / 1024:.1f} MB")
+    print(f"   • 总耗时: {summary['wall_time']:.2f} 秒")
+    print(f"   • 吞吐: {summary['files_per_sec']:.2f} 文件/秒, {summary['pages_per_sec']:.2f} 页/秒")
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="批量处理目录中的PDF文件")
+    parser.add_argument("input", nargs="?", default=DEFAULT_INPUT, help="PDF目录或通配符 (默认: docs/pdfs)")
+    parser.add_argument("output_dir", nargs="?", default=DEFAULT_OUTPUT_DIR, help="输出根目录")
+    parser.add_argument("--mode", choices=['render', 'extract', 'both'], default='render',
+                        help="render=页面转图片, extract=提取内嵌图片, both=两者都做")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="同时处理的文件数")
+    parser.add_argument("--timeout", type=float, default=600, help="单个文件的超时时间（秒）")
+    parser.add_argument("--dpi", type=int, default=150, help="渲染DPI (默认: 150)")
+    parser.add_argument("--responsive", action="store_true", help="按默认宽度阶梯输出WebP和JPEG变体")
+    parser.add_argument("--low-memory", action="store_true", help="提取图片时使用低内存模式")
+    parser.add_argument("--verbose", action="store_true", help="显示每个文件的详细输出")
+    return parser.parse_args(argv)
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+
+    pdf_files = find_pdf_files(args.input)
+    if not pdf_files:
+        print(f"没有找到PDF文件: {args.input}")
+        sys.exit(1)
+
+    ladder = None
+    if args.responsive:
+        from convert_pdf_to_images import ResponsiveLadder, DEFAULT_WIDTHS, DEFAULT_FORMATS
+        ladder = ResponsiveLadder(DEFAULT_WIDTHS, DEFAULT_FORMATS, 85)
+
+    print(f"开始批量处理 {len(pdf_files)} 个PDF文件 (并发 {args.workers}, 超时 {args.timeout}秒)")
+    _, summary = batch_convert(pdf_files, args.output_dir, mode=args.mode, workers=args.workers,
+                               timeout=args.timeout, verbose=args.verbose,
+                               options={'dpi': args.dpi, 'ladder': ladder, 'low_memory': args.low_memory})
+    print_summary(summary)
+    sys.exit(0 if summary['failed'] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
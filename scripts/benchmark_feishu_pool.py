@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+飞书客户端连接池基准测试
+对本地桩服务分别用"每次新建连接"和"连接池会话"发送请求，比较单请求延迟
+"""
+
+import time
+import argparse
+import statistics
+import requests
+
+from feishu_stub_server import start_stub_server
+from feishu_table_reader import FeishuAPI, create_session
+
+
+def percentile(samples, pct):
+    """计算百分位数（最近秩法）"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_requests(get, url, headers, count):
+    """顺序发送 count 个请求，返回每个请求的耗时（毫秒）"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = get(url, headers=headers, timeout=10)
+        response.raise_for_status()
+        response.content
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name, latencies):
+    """打印一组延迟的统计"""
+    print(f"{name}:")
+    print(f"   • 平均: {statistics.mean(latencies):.2f} ms")
+    print(f"   • p50: {percentile(latencies, 50):.2f} ms")
+    print(f"   • p95: {percentile(latencies, 95):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="飞书客户端连接池基准测试")
+    parser.add_argument("--requests", type=int, default=500, help="每种模式的请求数 (默认: 500)")
+    parser.add_argument("--records", type=int, default=500, help="桩服务表格记录数 (默认: 500)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.records)
+    state = server.state
+    try:
+        api = FeishuAPI("stub-app", "stub-secret", base_url)
+        api.get_tenant_access_token()
+        url = f"{base_url}/bitable/v1/apps/{state.app_token}/tables/{state.table_id}/records?page_size=100"
+        headers = {"Authorization": f"Bearer {api.access_token}"}
+
+        print(f"🏁 对 {url} 各发送 {args.requests} 个请求\n")
+
+        # 预热
+        run_requests(requests.get, url, headers, 5)
+
+        # 不使用连接池：每次调用都新建连接
+        no_pool = run_requests(requests.get, url, headers, args.requests)
+
+        # 使用连接池和长连接
+        session = create_session()
+        run_requests(session.get, url, headers, 5)
+        pooled = run_requests(session.get, url, headers, args.requests)
+        session.close()
+        api.close()
+
+        report("❌ 无连接池 (requests.get)", no_pool)
+        report("✅ 连接池会话 (create_session)", pooled)
+        speedup = statistics.mean(no_pool) / statistics.mean(pooled)
+        print(f"\n⚡ 连接池平均快 {speedup:.2f} 倍")
+        print("💡 本地桩服务为明文HTTP，真实环境下还会省去每次的TLS握手，差距更大")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
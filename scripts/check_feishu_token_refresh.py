@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+飞书令牌刷新检查
+用有效期很短的令牌启动本地桩服务，持续调用接口一段时间，
+确认后台刷新不会连续请求鉴权接口，且期间的接口调用都能成功
+"""
+
+import sys
+import time
+import argparse
+
+from feishu_stub_server import start_stub_server
+from feishu_table_reader import FeishuAPI
+
+
+def expected_auth_requests(token_manager, token_ttl, duration):
+    """在 duration 秒内最多应有的鉴权请求数（首次获取 + 后台刷新 + 1 次余量）"""
+    return 1 + int(duration // token_manager.refresh_delay(token_ttl)) + 1
+
+
+def run_check(token_ttl, duration):
+    """对一种令牌有效期运行检查，返回是否通过"""
+    server, base_url = start_stub_server(10, token_ttl=token_ttl)
+    state = server.state
+    api = FeishuAPI("stub-app", "stub-secret", base_url)
+    calls = 0
+    failures = 0
+    try:
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            if api.get_app_table_info(state.app_token, state.table_id) is None:
+                failures += 1
+            calls += 1
+            time.sleep(0.01)
+    finally:
+        api.close()
+        server.shutdown()
+
+    limit = expected_auth_requests(api.token_manager, token_ttl, duration)
+    passed = state.auth_requests <= limit and failures == 0
+    print(f"{'✅' if passed else '❌'} 令牌有效期 {token_ttl}秒, 运行 {duration:g}秒: "
+          f"接口调用 {calls} 次 (失败 {failures}), 鉴权请求 {state.auth_requests} 次 (上限 {limit})")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="飞书令牌刷新检查")
+    parser.add_argument("--duration", type=float, default=5.0, help="每种有效期持续调用的秒数 (默认: 5)")
+    parser.add_argument("--ttls", type=int, nargs="+", default=[120, 4],
+                        help="要检查的令牌有效期（秒），应小于提前刷新的余量 (默认: 120 4)")
+    args = parser.parse_args()
+
+    results = [run_check(ttl, args.duration) for ttl in args.ttls]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
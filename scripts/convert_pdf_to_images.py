@@ -1,62 +1,419 @@
 #!/usr/bin/env python3
 import os
 import sys
+import json
+import re
+import time
+import hashlib
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 import fitz  # PyMuPDF
+from PIL import Image
 
-def convert_pdf_pages_to_images(pdf_path, output_dir, dpi=150):
-    """将PDF的每一页转换为图片"""
-    
-    # 创建输出目录
-    os.makedirs(output_dir, exist_ok=True)
-    
+# 默认路径
+DEFAULT_PDF_PATH = "/Volumes/003/personal-website-backup-20250925 3/personal-website/docs/pdfs/伍六七毛绒盲盒-1.pdf"
+DEFAULT_OUTPUT_DIR = "/Volumes/003/personal-website-backup-20250925 3/personal-website/public/pdf-images"
+
+# 渲染清单（记录每页内容哈希，用于增量渲染）
+# 输出目录在 public/ 下时清单放到项目的 .cache/pdf-render/ 中，避免被站点公开
+MANIFEST_NAME = '.render-manifest.json'
+MANIFEST_CACHE_DIR = os.path.join('.cache', 'pdf-render')
+MANIFEST_VERSION = 1
+OUTPUT_FORMAT = 'jpeg'
+
+# 响应式输出：一次渲染，按宽度阶梯缩放并输出多种格式
+ResponsiveLadder = namedtuple('ResponsiveLadder', ['widths', 'formats', 'quality'])
+DEFAULT_WIDTHS = (300, 600, 1200, 2400)
+DEFAULT_FORMATS = ('webp', 'jpeg')
+FORMAT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+# 间接引用，如 "12 0 R"
+_XREF_REF_RE = re.compile(r'(\d+)\s+\d+\s+R\b')
+
+
+def _update_with_xref(digest, doc, xref):
+    """把一个对象的原始数据加入哈希：流对象取原始流（不解码），其余取对象定义"""
+    if doc.xref_is_stream(xref):
+        digest.update(doc.xref_stream_raw(xref))
+    else:
+        digest.update(doc.xref_object(xref, compressed=True).encode())
+
+
+def page_content_hash(doc, page_num):
+    """计算页面内容哈希，不做渲染
+
+    覆盖 get_pixmap 渲染时用到的全部内容：页面几何、内容流、表单XObject
+    （含嵌套）的内容流、注释及其外观流，以及引用的图片/字体原始数据。
+    """
+    page = doc[page_num]
+    digest = hashlib.sha256()
+    digest.update(f"{tuple(page.rect)}|{page.rotation}".encode())
+    digest.update(page.read_contents())
+    # 表单XObject的对象定义和内容流，按出现顺序
+    for xref, name, invoker, bbox in page.get_xobjects():
+        digest.update(f"|xobject {name} {invoker} {tuple(bbox)}|".encode())
+        digest.update(doc.xref_object(xref, compressed=True).encode())
+        digest.update(doc.xref_stream_raw(xref))
+    # 注释：对象定义（位置、标志、外观状态等）和各状态的外观流
+    for annot in page.annots():
+        digest.update(f"|annot {annot.xref}|".encode())
+        digest.update(doc.xref_object(annot.xref, compressed=True).encode())
+        kind, value = doc.xref_get_key(annot.xref, "AP/N")
+        if kind in ('xref', 'dict'):
+            for ap_xref in sorted(int(ref) for ref in _XREF_REF_RE.findall(value)):
+                _update_with_xref(digest, doc, ap_xref)
+    # 图片和字体的原始流（不解码）
+    xrefs = {img[0] for img in page.get_images(full=True)} | {font[0] for font in page.get_fonts(full=True)}
+    for xref in sorted(x for x in xrefs if x > 0):
+        _update_with_xref(digest, doc, xref)
+    return digest.hexdigest()
+
+
+def default_manifest_path(output_dir):
+    """渲染清单的默认位置
+
+    输出目录位于 public/ 下时，清单放在与 public 同级的 .cache/pdf-render/ 中，
+    按输出目录相对 public 的路径区分；否则放在输出目录中。
+    """
+    output_dir = os.path.abspath(output_dir)
+    parts = output_dir.split(os.sep)
+    if 'public' in parts:
+        index = len(parts) - 1 - parts[::-1].index('public')
+        root = os.sep.join(parts[:index]) or os.sep
+        relative = os.path.join(*parts[index + 1:]) if parts[index + 1:] else ''
+        return os.path.join(root, MANIFEST_CACHE_DIR, relative, MANIFEST_NAME)
+    return os.path.join(output_dir, MANIFEST_NAME)
+
+
+def load_render_manifest(manifest_path):
+    """读取渲染清单，不存在或损坏时返回空清单"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': MANIFEST_VERSION, 'pages': {}}
+
+
+def save_render_manifest(manifest_path, manifest):
+    """原子写入渲染清单"""
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _output_path(output_dir, page_num):
+    """页面对应的输出文件路径"""
+    return os.path.join(output_dir, f'product-planning-page-{page_num + 1}.jpg')
+
+
+def _variant_path(output_dir, page_num, width, fmt):
+    """响应式变体的输出文件路径"""
+    return os.path.join(output_dir, f'product-planning-page-{page_num + 1}-{width}w.{FORMAT_EXTENSIONS[fmt]}')
+
+
+def _page_outputs(output_dir, page_num, ladder):
+    """页面在当前模式下应生成的全部文件"""
+    if ladder is None:
+        return [_output_path(output_dir, page_num)]
+    return [_variant_path(output_dir, page_num, width, fmt)
+            for width in ladder.widths for fmt in ladder.formats]
+
+
+def _format_key(ladder):
+    """写入渲染清单的输出格式标识，阶梯或格式变化时页面会被重新渲染"""
+    if ladder is None:
+        return OUTPUT_FORMAT
+    widths = ','.join(str(width) for width in ladder.widths)
+    return f"{'+'.join(ladder.formats)}@{widths}q{ladder.quality}"
+
+
+def save_responsive_variants(pix, output_dir, page_num, ladder):
+    """把一次渲染得到的pixmap按宽度阶梯缩放，并保存为多种格式
+
+    直接使用pixmap的原始像素构建图像，不经过中间文件和再次解码；
+    从大到小逐级缩放，每一级都以上一级为源，减少重采样的计算量。
+    渲染尺寸取整后可能与最大宽度差1像素，所以宽度不等时都会缩放到阶梯宽度，
+    保证文件名中的宽度与实际像素一致。
+    """
+    mode = 'RGBA' if pix.alpha else 'RGB'
+    image = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+    if mode == 'RGBA':
+        image = image.convert('RGB')
+
+    saved = []
+    current = image
+    for width in sorted(ladder.widths, reverse=True):
+        if width != current.width:
+            height = max(1, round(current.height * width / current.width))
+            current = current.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+        for fmt in ladder.formats:
+            output_path = _variant_path(output_dir, page_num, width, fmt)
+            if fmt == 'webp':
+                current.save(output_path, 'WEBP', quality=ladder.quality, method=6)
+            else:
+                current.save(output_path, 'JPEG', quality=ladder.quality, optimize=True, progressive=True)
+            saved.append(output_path)
+    return saved
+
+
+def _split_into_chunks(page_numbers, chunk_count):
+    """把页码列表切分为连续的若干块，保持原有顺序"""
+    chunk_count = max(1, min(chunk_count, len(page_numbers)))
+    size, extra = divmod(len(page_numbers), chunk_count)
+    chunks = []
+    start = 0
+    for i in range(chunk_count):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(page_numbers[start:end])
+        start = end
+    return chunks
+
+
+def parse_page_ranges(spec, page_count):
+    """解析页码范围，如 "1-50,80" 或 "80-"，返回排好序的0起始页码列表"""
+    pages = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start_text, end_text = part.split('-', 1)
+            start = int(start_text) if start_text.strip() else 1
+            end = int(end_text) if end_text.strip() else page_count
+        else:
+            start = end = int(part)
+        if start < 1 or end < start:
+            raise ValueError(f"无效的页码范围: {part}")
+        # 超出文档的部分直接截断
+        pages.update(range(start - 1, min(end, page_count)))
+    return sorted(pages)
+
+
+def iter_rendered_pages(pdf_path, pages=None, dpi=150, as_bytes=False, width=None):
+    """逐页渲染PDF，每次产出 (页码, pixmap) 或 (页码, 编码后的图片字节)
+
+    pages 为0起始页码列表，None表示全部页面。一次只保留一页的渲染结果，
+    适合直接交给上传或优化流程，而不需要先落盘。
+    指定 width 时按目标像素宽度渲染，忽略 dpi。
+    """
+    # 设置缩放因子（DPI转换）
+    zoom = dpi / 72  # 72是PDF的默认DPI
+    mat = fitz.Matrix(zoom, zoom)
+
+    doc = fitz.open(pdf_path)
     try:
-        # 打开PDF文件
-        doc = fitz.open(pdf_path)
-        
-        print(f"PDF文件有 {len(doc)} 页")
-        
-        # 遍历每一页
-        for page_num in range(len(doc)):
-            print(f"正在处理第 {page_num + 1} 页...")
-            
-            # 获取页面
+        if pages is None:
+            pages = range(len(doc))
+        for page_num in pages:
             page = doc[page_num]
-            
-            # 设置缩放因子（DPI转换）
-            zoom = dpi / 72  # 72是PDF的默认DPI
-            mat = fitz.Matrix(zoom, zoom)
-            
+            if width:
+                zoom = width / page.rect.width
+                mat = fitz.Matrix(zoom, zoom)
+
             # 渲染页面为图片
             pix = page.get_pixmap(matrix=mat)
-            
-            # 保存图片
-            output_path = os.path.join(output_dir, f'product-planning-page-{page_num + 1}.jpg')
-            pix.save(output_path, 'jpeg')
-            
-            print(f"已保存: {output_path}")
-            
-            # 只处理前5页
-            if page_num >= 4:
-                break
-        
+            if as_bytes:
+                yield page_num, pix.tobytes(OUTPUT_FORMAT)
+            else:
+                yield page_num, pix
+            pix = None
+    finally:
+        doc.close()
+
+
+def _save_page(pix, output_dir, page_num, ladder):
+    """保存一页的渲染结果，返回写入的文件列表"""
+    if ladder is not None:
+        return save_responsive_variants(pix, output_dir, page_num, ladder)
+    output_path = _output_path(output_dir, page_num)
+    pix.save(output_path, OUTPUT_FORMAT)
+    return [output_path]
+
+
+def _iter_pages_for_output(pdf_path, page_numbers, dpi, ladder):
+    """按输出模式渲染页面：响应式模式只按阶梯中的最大宽度渲染一次"""
+    width = max(ladder.widths) if ladder is not None else None
+    return iter_rendered_pages(pdf_path, page_numbers, dpi, width=width)
+
+
+def _render_page_chunk(pdf_path, output_dir, dpi, page_numbers, ladder=None):
+    """在独立的文档句柄上渲染一块连续页面（供进程池调用）"""
+    saved = []
+    for page_num, pix in _iter_pages_for_output(pdf_path, page_numbers, dpi, ladder):
+        # 保存图片
+        saved.extend(_save_page(pix, output_dir, page_num, ladder))
+    return saved
+
+
+def _record_page(manifest, page_num, page_hash, dpi, output_dir, ladder):
+    """在清单中记录已渲染页面"""
+    manifest['pages'][str(page_num + 1)] = {
+        'hash': page_hash,
+        'dpi': dpi,
+        'format': _format_key(ladder),
+        'outputs': [os.path.basename(path) for path in _page_outputs(output_dir, page_num, ladder)],
+    }
+
+
+def convert_pdf_pages_to_images(pdf_path, output_dir, dpi=150, workers=1, incremental=True, pages=None,
+                                ladder=None, manifest_path=None):
+    """将PDF的页面转换为图片
+
+    pages 为0起始页码列表，None表示全部页面。
+    ladder 为 ResponsiveLadder 时每页只渲染一次（按最大宽度），
+    再在内存中缩放出各宽度的WebP/JPEG变体，代替单一DPI的JPEG输出。
+    workers 大于1时使用进程池并行渲染，每个进程打开自己的文档句柄，
+    输出文件名只由页码决定，因此结果与串行模式一致。
+    incremental 为True时根据渲染清单跳过内容哈希、DPI和格式都未变化的页面；
+    为False时仍在原清单上更新本次渲染的页面，其余页面的记录保留。
+    manifest_path 默认见 default_manifest_path。
+    返回包含页数、跳过页数、写入字节数、耗时和每秒页数的统计信息。
+    """
+
+    # 创建输出目录
+    os.makedirs(output_dir, exist_ok=True)
+
+    stats = {'pages': 0, 'skipped': 0, 'bytes_written': 0, 'elapsed': 0.0, 'pages_per_sec': 0.0, 'error': None}
+    start_time = time.perf_counter()
+    if manifest_path is None:
+        manifest_path = default_manifest_path(output_dir)
+    # 旧版本把清单写在输出目录中：新位置还没有清单时从旧位置迁移，保存后删除旧文件
+    legacy_path = os.path.join(output_dir, MANIFEST_NAME)
+    if os.path.abspath(legacy_path) == os.path.abspath(manifest_path):
+        legacy_path = None
+    if legacy_path and os.path.exists(legacy_path) and not os.path.exists(manifest_path):
+        manifest = load_render_manifest(legacy_path)
+    else:
+        manifest = load_render_manifest(manifest_path)
+
+    try:
+        # 打开PDF文件读取页数并计算页面哈希
+        with fitz.open(pdf_path) as doc:
+            page_count = len(doc)
+
+            print(f"PDF文件有 {page_count} 页")
+
+            if pages is None:
+                all_pages = list(range(page_count))
+            else:
+                all_pages = [page_num for page_num in pages if 0 <= page_num < page_count]
+            page_hashes = {page_num: page_content_hash(doc, page_num) for page_num in all_pages}
+
+        page_numbers = []
+        for page_num in all_pages:
+            entry = manifest['pages'].get(str(page_num + 1))
+            if (incremental and entry
+                    and entry.get('hash') == page_hashes[page_num]
+                    and entry.get('dpi') == dpi
+                    and entry.get('format') == _format_key(ladder)
+                    and all(os.path.exists(path) for path in _page_outputs(output_dir, page_num, ladder))):
+                stats['skipped'] += 1
+            else:
+                page_numbers.append(page_num)
+
+        if stats['skipped']:
+            print(f"跳过 {stats['skipped']} 个未变化的页面")
+
+        if workers > 1 and len(page_numbers) > 1:
+            chunks = _split_into_chunks(page_numbers, workers)
+            print(f"使用 {len(chunks)} 个进程并行渲染...")
+            with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                futures = [
+                    executor.submit(_render_page_chunk, pdf_path, output_dir, dpi, chunk, ladder)
+                    for chunk in chunks
+                ]
+                chunk_pages = dict(zip(futures, chunks))
+                # 按块顺序收集结果，保证输出顺序确定
+                for future in futures:
+                    for output_path in future.result():
+                        print(f"已保存: {output_path}")
+                        stats['bytes_written'] += os.path.getsize(output_path)
+                    stats['pages'] += len(chunk_pages[future])
+                    for page_num in chunk_pages[future]:
+                        _record_page(manifest, page_num, page_hashes[page_num], dpi, output_dir, ladder)
+        elif page_numbers:
+            for page_num, pix in _iter_pages_for_output(pdf_path, page_numbers, dpi, ladder):
+                print(f"正在处理第 {page_num + 1} 页...")
+                for output_path in _save_page(pix, output_dir, page_num, ladder):
+                    print(f"已保存: {output_path}")
+                    stats['bytes_written'] += os.path.getsize(output_path)
+                stats['pages'] += 1
+                _record_page(manifest, page_num, page_hashes[page_num], dpi, output_dir, ladder)
+
         print("PDF页面转换完成!")
-        
+
     except Exception as e:
         print(f"处理PDF文件时出错: {e}")
+        stats['error'] = str(e)
     finally:
-        if 'doc' in locals():
-            doc.close()
+        # 即使中途出错，已完成的页面也写入清单
+        save_render_manifest(manifest_path, manifest)
+        if legacy_path and os.path.exists(legacy_path):
+            os.remove(legacy_path)
+
+    stats['elapsed'] = time.perf_counter() - start_time
+    if stats['elapsed'] > 0:
+        stats['pages_per_sec'] = stats['pages'] / stats['elapsed']
+    print(f"共渲染 {stats['pages']} 页 (跳过 {stats['skipped']} 页)，耗时 {stats['elapsed']:.2f} 秒 ({stats['pages_per_sec']:.2f} 页/秒)")
+    return stats
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="将PDF页面转换为图片")
+    parser.add_argument("pdf_path", nargs="?", default=DEFAULT_PDF_PATH, help="PDF文件路径")
+    parser.add_argument("output_dir", nargs="?", default=DEFAULT_OUTPUT_DIR, help="输出目录")
+    parser.add_argument("--dpi", type=int, default=150, help="渲染DPI (默认: 150)")
+    parser.add_argument("--workers", type=int, default=1, help="并行渲染的进程数 (默认: 1)")
+    parser.add_argument("--force", action="store_true", help="忽略渲染清单，重新渲染所有页面")
+    parser.add_argument("--manifest", help="渲染清单路径 (默认: 输出目录在 public/ 下时为项目的 .cache/pdf-render/)")
+    page_group = parser.add_mutually_exclusive_group()
+    page_group.add_argument("--pages", help="要转换的页码范围，如 1-50,80 (从1开始)")
+    page_group.add_argument("--all", action="store_true", help="转换全部页面 (默认)")
+    parser.add_argument("--responsive", action="store_true",
+                        help="每页渲染一次，按宽度阶梯输出WebP和JPEG变体")
+    parser.add_argument("--widths", default=','.join(str(w) for w in DEFAULT_WIDTHS),
+                        help="响应式宽度阶梯 (默认: 300,600,1200,2400)")
+    parser.add_argument("--formats", default=','.join(DEFAULT_FORMATS),
+                        help="响应式输出格式，可选 webp,jpeg (默认: webp,jpeg)")
+    parser.add_argument("--quality", type=int, default=85, help="响应式输出质量 (默认: 85)")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    # PDF文件路径
-    pdf_path = "/Volumes/003/personal-website-backup-20250925 3/personal-website/docs/pdfs/伍六七毛绒盲盒-1.pdf"
-
-    # 输出目录
-    output_dir = "/Volumes/003/personal-website-backup-20250925 3/personal-website/public/pdf-images"
-    
-    if not os.path.exists(pdf_path):
-        print(f"PDF文件不存在: {pdf_path}")
+    args = parse_args()
+
+    if not os.path.exists(args.pdf_path):
+        print(f"PDF文件不存在: {args.pdf_path}")
         sys.exit(1)
-    
-    print(f"开始转换PDF文件为图片: {pdf_path}")
-    convert_pdf_pages_to_images(pdf_path, output_dir)
\ No newline at end of file
+
+    pages = None
+    if args.pages and not args.all:
+        with fitz.open(args.pdf_path) as doc:
+            page_count = len(doc)
+        try:
+            pages = parse_page_ranges(args.pages, page_count)
+        except ValueError as e:
+            print(f"页码参数错误: {e}")
+            sys.exit(1)
+
+    ladder = None
+    if args.responsive:
+        formats = tuple(fmt.strip().lower() for fmt in args.formats.split(',') if fmt.strip())
+        unknown = [fmt for fmt in formats if fmt not in FORMAT_EXTENSIONS]
+        if unknown:
+            print(f"不支持的输出格式: {', '.join(unknown)}")
+            sys.exit(1)
+        widths = tuple(sorted({int(w) for w in args.widths.split(',') if w.strip()}))
+        ladder = ResponsiveLadder(widths, formats, args.quality)
+
+    print(f"开始转换PDF文件为图片: {args.pdf_path}")
+    convert_pdf_pages_to_images(args.pdf_path, args.output_dir, dpi=args.dpi, workers=args.workers,
+                                incremental=not args.force, pages=pages, ladder=ladder,
+                                manifest_path=args.manifest)
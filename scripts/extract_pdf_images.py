@@ -1,69 +1,210 @@
 #!/usr/bin/env python3
 import os
 import sys
-from PyPDF2 import PdfReader
+import mmap
+import hashlib
+import argparse
+from PyPDF2 import PdfReader, PageObject
 from PIL import Image
 import io
 
-def extract_images_from_pdf(pdf_path, output_dir):
-    """从PDF文件中提取图片并保存到指定目录"""
-    
+# 非 JPEG 图片通过公开接口 page.images 解码，该接口从 PyPDF2 3.0 开始提供；
+# 抛出 ImportError 而不是退出进程，批量转换导入本模块时只让当前文件失败
+if not hasattr(PageObject, "images"):
+    raise ImportError("需要 PyPDF2 3.0 或更高版本: pip install 'PyPDF2>=3.0'")
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+# 默认路径
+DEFAULT_PDF_PATH = "/Users/d1/Library/Mobile Documents/com~apple~CloudDocs/personal-website-backup-20250925 2/伍六七毛绒盲盒-1.pdf"
+DEFAULT_OUTPUT_DIR = "/Users/d1/Library/Mobile Documents/com~apple~CloudDocs/personal-website-backup-20250925 2/public/pdf-images"
+
+# 可以原样写出的压缩格式（本身就是完整的图片文件）
+PASSTHROUGH_FILTERS = {
+    '/DCTDecode': '.jpg',
+    '/JPXDecode': '.jp2',
+}
+
+
+def _image_filters(image_obj):
+    """返回图片流的过滤器列表"""
+    filters = image_obj.get('/Filter')
+    if filters is None:
+        return []
+    if isinstance(filters, list):
+        return [str(f) for f in filters]
+    return [str(filters)]
+
+
+def _encode_image(image_obj, passthrough=True):
+    """把图片XObject编码为可写入磁盘的 (扩展名, 字节)
+
+    passthrough 模式下 DCT/JPX 流直接原样写出，不做解码；
+    其他过滤器需要交给 PyPDF2 解码（见 _decode_page_images），此时返回None。
+    """
+    filters = _image_filters(image_obj)
+    if passthrough and filters and filters[-1] in PASSTHROUGH_FILTERS:
+        extension = PASSTHROUGH_FILTERS[filters[-1]]
+        if len(filters) == 1:
+            return extension, image_obj._data
+        # 外层还有其他过滤器时只解开外层，JPEG/JPX 数据本身保持不变
+        return extension, image_obj.get_data()
+
+    if not passthrough:
+        # 旧的处理方式：解码后统一转成PNG
+        img = Image.open(io.BytesIO(image_obj._data))
+        buffer = io.BytesIO()
+        img.save(buffer, 'PNG')
+        return '.png', buffer.getvalue()
+
+    return None
+
+
+def _decode_page_images(page):
+    """用 PyPDF2 的公开接口 page.images 解码本页全部图片，返回 {对象名: (扩展名, 字节)}"""
+    decoded = {}
+    for image in page.images:
+        name, extension = os.path.splitext(image.name)
+        decoded[name] = (extension or '.png', image.data)
+    return decoded
+
+
+def peak_rss_bytes():
+    """当前进程的RSS峰值（字节），无法获取时返回None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位是KB，macOS 上是字节
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def extract_images_from_pdf(pdf_path, output_dir, passthrough=True, low_memory=False):
+    """从PDF文件中提取图片并保存到指定目录
+
+    输出文件按页码和对象名唯一命名，内容完全相同的图片（按原始流哈希）
+    跨页只写出一次。
+    low_memory 为True时通过内存映射读取PDF，逐页按需解析XObject，
+    并在每页处理完后释放已解析的对象，使峰值内存不随页数增长。
+    返回提取统计信息（含RSS峰值）。
+    """
+
     # 创建输出目录
     os.makedirs(output_dir, exist_ok=True)
-    
+
+    stats = {'pages': 0, 'images': 0, 'duplicates': 0, 'bytes_written': 0, 'peak_rss': None, 'error': None}
+    seen_hashes = {}
+
     try:
         # 读取PDF文件
         with open(pdf_path, 'rb') as file:
-            reader = PdfReader(file)
-            
-            print(f"PDF文件有 {len(reader.pages)} 页")
-            
-            # 遍历每一页
-            for page_num, page in enumerate(reader.pages):
-                print(f"正在处理第 {page_num + 1} 页...")
-                
-                # 尝试提取图片
-                if '/Resources' in page:
-                    if '/XObject' in page['/Resources']:
-                        x_object = page['/Resources']['/XObject'].get_object()
-                        
-                        for obj in x_object:
-                            if x_object[obj]['/Subtype'] == '/Image':
-                                try:
-                                    # 获取图片数据
-                                    image_data = x_object[obj]._data
-                                    
-                                    # 创建图片对象
-                                    img = Image.open(io.BytesIO(image_data))
-                                    
-                                    # 保存图片
-                                    output_path = os.path.join(output_dir, f'product-planning-page-{page_num + 1}.png')
-                                    img.save(output_path, 'PNG')
-                                    
-                                    print(f"已保存: {output_path}")
-                                    
-                                except Exception as e:
-                                    print(f"处理图片时出错: {e}")
-                
-                # 如果没有找到图片，尝试其他方法
-                else:
-                    print(f"第 {page_num + 1} 页没有找到资源")
-            
-            print("图片提取完成!")
-            
+            stream = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if low_memory else file
+            try:
+                _extract_from_stream(stream, output_dir, passthrough, low_memory, stats, seen_hashes)
+            finally:
+                if low_memory:
+                    stream.close()
+
     except Exception as e:
         print(f"处理PDF文件时出错: {e}")
+        stats['error'] = str(e)
+
+    stats['peak_rss'] = peak_rss_bytes()
+    if stats['peak_rss'] is not None:
+        print(f"RSS峰值: {stats['peak_rss'] / 1024 / 1024:.1f} MB")
+    return stats
+
+
+def _extract_from_stream(stream, output_dir, passthrough, low_memory, stats, seen_hashes):
+    """逐页提取图片的主循环"""
+    reader = PdfReader(stream)
+
+    page_count = len(reader.pages)
+    print(f"PDF文件有 {page_count} 页")
+
+    # 遍历每一页
+    for page_num in range(page_count):
+        page = reader.pages[page_num]
+        print(f"正在处理第 {page_num + 1} 页...")
+        stats['pages'] += 1
+
+        # 尝试提取图片
+        if '/Resources' in page:
+            if '/XObject' in page['/Resources']:
+                x_object = page['/Resources']['/XObject'].get_object()
+                # 本页需要 PyPDF2 解码的图片第一次出现时再整页解码，之后复用
+                page_images = None
+
+                for obj in x_object:
+                    image_obj = x_object[obj].get_object()
+                    if image_obj['/Subtype'] == '/Image':
+                        try:
+                            # 按原始流去重，重复图片无需再解码
+                            digest = hashlib.sha256(image_obj._data).hexdigest()
+                            if digest in seen_hashes:
+                                stats['duplicates'] += 1
+                                print(f"重复图片，已存在: {seen_hashes[digest]}")
+                                continue
+
+                            name = str(obj).lstrip('/')
+                            encoded = _encode_image(image_obj, passthrough)
+                            if encoded is None:
+                                if page_images is None:
+                                    page_images = _decode_page_images(page)
+                                if name not in page_images:
+                                    raise ValueError("PyPDF2 无法解码该图片的格式")
+                                encoded = page_images[name]
+                            extension, data = encoded
+
+                            # 保存图片
+                            output_path = os.path.join(
+                                output_dir, f'product-planning-page-{page_num + 1}-{name}{extension}')
+                            with open(output_path, 'wb') as out:
+                                out.write(data)
+
+                            seen_hashes[digest] = output_path
+                            stats['images'] += 1
+                            stats['bytes_written'] += len(data)
+                            print(f"已保存: {output_path}")
+
+                        except Exception as e:
+                            print(f"处理图片时出错: {e}")
+
+        # 如果没有找到图片，尝试其他方法
+        else:
+            print(f"第 {page_num + 1} 页没有找到资源")
+
+        if low_memory:
+            # 释放本页解析出的对象（含图片流），下一页重新按需读取
+            page = x_object = image_obj = page_images = None
+            reader.resolved_objects.clear()
+
+    print("图片提取完成!")
+    print(f"共保存 {stats['images']} 张图片，跳过 {stats['duplicates']} 张重复图片，"
+          f"写入 {stats['bytes_written']:,} 字节")
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="从PDF中提取图片")
+    parser.add_argument("pdf_path", nargs="?", default=DEFAULT_PDF_PATH, help="PDF文件路径")
+    parser.add_argument("output_dir", nargs="?", default=DEFAULT_OUTPUT_DIR, help="输出目录")
+    parser.add_argument("--reencode", action="store_true",
+                        help="关闭直通模式，所有图片解码后重新编码为PNG")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="内存映射读取PDF并逐页释放资源，适合超大文件")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    # PDF文件路径
-    pdf_path = "/Users/d1/Library/Mobile Documents/com~apple~CloudDocs/personal-website-backup-20250925 2/伍六七毛绒盲盒-1.pdf"
-    
-    # 输出目录
-    output_dir = "/Users/d1/Library/Mobile Documents/com~apple~CloudDocs/personal-website-backup-20250925 2/public/pdf-images"
-    
-    if not os.path.exists(pdf_path):
-        print(f"PDF文件不存在: {pdf_path}")
+    args = parse_args()
+
+    if not os.path.exists(args.pdf_path):
+        print(f"PDF文件不存在: {args.pdf_path}")
         sys.exit(1)
-    
-    print(f"开始处理PDF文件: {pdf_path}")
-    extract_images_from_pdf(pdf_path, output_dir)
\ No newline at end of file
+
+    print(f"开始处理PDF文件: {args.pdf_path}")
+    extract_images_from_pdf(args.pdf_path, args.output_dir, passthrough=not args.reencode,
+                            low_memory=args.low_memory)
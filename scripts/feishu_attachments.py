@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+飞书多维表格附件批量下载
+遍历记录收集附件，按 file_token 去重后并发下载到本地，支持断点续传和跳过已下载的文件
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Iterable, List, Callable, Tuple
+
+from feishu_metrics import FeishuMetrics
+from feishu_table_reader import (FeishuAPI, FeishuAPIError, DEFAULT_BASE_URL, DEFAULT_POOL_SIZE,
+                                 parse_feishu_url, load_credentials)
+
+# 默认输出目录
+DEFAULT_OUTPUT_DIR = "public/assets/images/feishu"
+
+# 每次写入磁盘的块大小
+CHUNK_SIZE = 256 * 1024
+
+# 默认并发下载数（不超过连接池大小）
+DEFAULT_WORKERS = 4
+
+MANIFEST_NAME = ".attachments-manifest.json"
+MANIFEST_VERSION = 1
+
+def iter_attachments(records: Iterable[Dict[str, Any]],
+                     field_names: Optional[List[str]] = None) -> Iterable[Dict[str, Any]]:
+    """产出记录中的所有附件对象；field_names 为空时检查全部字段"""
+    for record in records:
+        fields = record.get("fields") or {}
+        for name, value in fields.items():
+            if field_names and name not in field_names:
+                continue
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, dict) and item.get("file_token"):
+                        yield item
+
+def collect_attachments(records: Iterable[Dict[str, Any]],
+                        field_names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """按 file_token 去重，返回 {file_token: 附件}，保持首次出现的顺序"""
+    attachments = {}
+    for attachment in iter_attachments(records, field_names):
+        attachments.setdefault(attachment["file_token"], attachment)
+    return attachments
+
+def attachment_filename(attachment: Dict[str, Any]) -> str:
+    """本地文件名：file_token 加原文件扩展名，保证同一附件只对应一个文件"""
+    extension = os.path.splitext(attachment.get("name") or "")[1].lower()
+    return f"{attachment['file_token']}{extension}"
+
+def load_manifest(output_dir: str) -> Dict[str, Dict[str, Any]]:
+    """读取已下载附件的清单 {file_token: {"file", "size", "sha256"}}"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+def save_manifest(output_dir: str, files: Dict[str, Dict[str, Any]]) -> None:
+    """原子写入清单"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def optimize_to_webp(path: str, attachment: Dict[str, Any], max_width: int = 1200, quality: int = 85) -> Optional[str]:
+    """下载完成回调：把图片附件转为同名 WebP（参数同 optimize-images.js 的作品集配置）"""
+    from PIL import Image
+
+    if not (attachment.get("type") or "").startswith("image/"):
+        return None
+    output_path = os.path.splitext(path)[0] + ".webp"
+    if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(path):
+        return output_path
+    with Image.open(path) as img:
+        if img.width > max_width:
+            img = img.resize((max_width, round(img.height * max_width / img.width)), Image.LANCZOS)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+        img.save(output_path, "WEBP", quality=quality, method=6)
+    return output_path
+
+class AttachmentDownloader:
+    """并发下载附件
+
+    文件先写入 <文件名>.part，中断后再次运行会用 Range 请求从已有长度继续；
+    下载完成并校验大小后才改名为最终文件。已存在且大小（以及清单中的 sha256）
+    一致的文件直接跳过。on_complete(path, attachment) 在每个文件就绪后调用。
+    api 的连接池应不小于 workers（见 main），否则超出的并发每次都要新建连接。
+    """
+
+    def __init__(self, api: FeishuAPI, output_dir: str = DEFAULT_OUTPUT_DIR, workers: int = DEFAULT_WORKERS,
+                 on_complete: Optional[Callable[[str, Dict[str, Any]], Any]] = None, verify_hash: bool = False):
+        self.api = api
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self.on_complete = on_complete
+        self.verify_hash = verify_hash
+        self.manifest = {}
+
+    def _is_complete(self, file_token: str, path: str, expected_size: Optional[int]) -> bool:
+        """本地文件已完整存在：大小与附件一致，开启校验时 sha256 与清单一致"""
+        if not os.path.exists(path):
+            return False
+        entry = self.manifest.get(file_token)
+        size = os.path.getsize(path)
+        if expected_size is not None and size != expected_size:
+            return False
+        if expected_size is None and (entry is None or entry.get("size") != size):
+            return False
+        if self.verify_hash and entry and entry.get("sha256"):
+            return file_sha256(path) == entry["sha256"]
+        return True
+
+    def _fetch(self, attachment: Dict[str, Any], path: str) -> Tuple[str, int, str]:
+        """下载到 .part 文件并改名，返回 (状态, 本次写入字节数, sha256)"""
+        part_path = path + ".part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        digest = hashlib.sha256()
+        if offset:
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+
+        response = self.api.download_media(attachment["file_token"], offset=offset)
+        if response.status_code == 416:
+            # 本地残留的 .part 比远端文件还长，丢弃后从头下载
+            os.remove(part_path)
+            digest, offset = hashlib.sha256(), 0
+            response = self.api.download_media(attachment["file_token"])
+
+        with response:
+            if offset and response.status_code != 206:
+                # 服务端忽略了 Range，只能从头写
+                digest, offset = hashlib.sha256(), 0
+            written = 0
+            with open(part_path, 'ab' if offset else 'wb') as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+
+        expected_size = attachment.get("size")
+        if expected_size is not None and offset + written != expected_size:
+            os.remove(part_path)
+            raise FeishuAPIError(f"大小不符: 期望 {expected_size} 字节，实际 {offset + written} 字节")
+        os.replace(part_path, path)
+        return ("resumed" if offset else "downloaded"), written, digest.hexdigest()
+
+    def download(self, attachment: Dict[str, Any]) -> Dict[str, Any]:
+        """下载单个附件，返回结果（status 为 downloaded / resumed / skipped / failed）"""
+        file_token = attachment["file_token"]
+        path = os.path.join(self.output_dir, attachment_filename(attachment))
+        result = {"file_token": file_token, "path": path, "status": "skipped", "bytes": 0, "error": None}
+        try:
+            if not self._is_complete(file_token, path, attachment.get("size")):
+                result["status"], result["bytes"], sha256 = self._fetch(attachment, path)
+                self.manifest[file_token] = {"file": os.path.basename(path), "size": os.path.getsize(path),
+                                             "sha256": sha256}
+            if self.on_complete:
+                result["optimized"] = self.on_complete(path, attachment)
+        except Exception as e:
+            result.update(status="failed", error=str(e))
+        return result
+
+    def download_all(self, attachments: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """并发下载全部附件，返回每个附件的结果和汇总"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.manifest = load_manifest(self.output_dir)
+        start_time = time.perf_counter()
+        results = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for result in executor.map(self.download, attachments):
+                    if result["status"] == "failed":
+                        print(f"❌ {result['file_token']}: {result['error']}")
+                    elif result["status"] != "skipped":
+                        print(f"✅ {os.path.basename(result['path'])} ({result['bytes']:,} 字节)")
+                    results.append(result)
+        finally:
+            # 中断时也保存已完成的部分，下次运行据此跳过
+            save_manifest(self.output_dir, self.manifest)
+
+        summary = {"attachments": len(results), "bytes": sum(r["bytes"] for r in results),
+                   "elapsed": time.perf_counter() - start_time}
+        for status in ("downloaded", "resumed", "skipped", "failed"):
+            summary[status] = sum(1 for r in results if r["status"] == status)
+        return results, summary
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="批量下载飞书多维表格中的附件")
+    parser.add_argument("urls", nargs="+", metavar="url", help="飞书多维表格URL")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help=f"输出目录 (默认: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"并发下载数 (默认: {DEFAULT_WORKERS})")
+    parser.add_argument("--fields", nargs="+", help="只下载这些字段中的附件")
+    parser.add_argument("--snapshot", metavar="DB", help="从 SQLite 快照读取记录，不再请求记录接口")
+    parser.add_argument("--verify", action="store_true", help="跳过已存在文件前校验 sha256")
+    parser.add_argument("--optimize", action="store_true", help="下载完成后把图片转换为 WebP")
+    parser.add_argument("--metrics", metavar="PATH", help="运行结束后把请求指标导出为 JSON 文件")
+    return parser.parse_args(argv)
+
+def main():
+    """主函数"""
+    args = parse_args()
+
+    tables = [parse_feishu_url(url) for url in args.urls]
+    if not all(app_token and table_id for app_token, table_id in tables):
+        print("❌ 无法解析飞书URL")
+        return 1
+    app_id, app_secret = load_credentials()
+    if not app_id:
+        return 1
+
+    metrics = FeishuMetrics() if args.metrics else None
+    with FeishuAPI(app_id, app_secret, os.getenv("FEISHU_BASE_URL", DEFAULT_BASE_URL),
+                   pool_size=max(args.workers, DEFAULT_POOL_SIZE), metrics=metrics) as feishu_api:
+        attachments = {}
+        try:
+            if args.snapshot:
+                from feishu_snapshot import open_snapshot, load_snapshot
+                conn = open_snapshot(args.snapshot)
+                for app_token, table_id in tables:
+                    for token, item in collect_attachments(load_snapshot(conn, app_token, table_id), args.fields).items():
+                        attachments.setdefault(token, item)
+                conn.close()
+            else:
+                for app_token, table_id in tables:
+                    records = feishu_api.iter_records(app_token, table_id)
+                    for token, item in collect_attachments(records, args.fields).items():
+                        attachments.setdefault(token, item)
+        except FeishuAPIError as e:
+            print(f"❌ {e}")
+            return 1
+
+        print(f"📎 共 {len(attachments)} 个不重复的附件，开始下载 (并发 {args.workers})")
+        downloader = AttachmentDownloader(feishu_api, args.output_dir, args.workers,
+                                          on_complete=optimize_to_webp if args.optimize else None,
+                                          verify_hash=args.verify)
+        _, summary = downloader.download_all(attachments.values())
+
+    print(f"\n📊 下载 {summary['downloaded']} 个, 续传 {summary['resumed']} 个, 跳过 {summary['skipped']} 个, "
+          f"失败 {summary['failed']} 个")
+    print(f"   写入 {summary['bytes'] / 1024 / 1024:.1f} MB, 耗时 {summary['elapsed']:.2f} 秒")
+    if metrics:
+        metrics.dump(args.metrics)
+        print(f"📈 指标已导出到: {args.metrics}")
+    return 0 if summary["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+飞书多维表格记录解码
+根据表格的字段元数据为每张表编译一次解码器，把整页记录按列批量转换为类型化的列数组
+"""
+
+import math
+from array import array
+from collections import namedtuple
+from typing import Dict, Any, List, Iterable, Optional
+
+# 飞书字段类型编码
+FIELD_TEXT = 1
+FIELD_NUMBER = 2
+FIELD_SINGLE_SELECT = 3
+FIELD_MULTI_SELECT = 4
+FIELD_DATE = 5
+FIELD_CHECKBOX = 7
+FIELD_PERSON = 11
+FIELD_PHONE = 13
+FIELD_URL = 15
+FIELD_ATTACHMENT = 17
+FIELD_LINK = 18
+FIELD_LOOKUP = 19
+FIELD_FORMULA = 20
+FIELD_DUPLEX_LINK = 21
+FIELD_CREATED_TIME = 1001
+FIELD_MODIFIED_TIME = 1002
+FIELD_CREATED_USER = 1003
+FIELD_MODIFIED_USER = 1004
+FIELD_AUTO_NUMBER = 1005
+
+Person = namedtuple('Person', ['id', 'name'])
+Attachment = namedtuple('Attachment', ['file_token', 'name', 'size', 'type'])
+
+MISSING = float('nan')
+
+def _segments_text(value):
+    """文本字段可能是字符串，也可能是富文本片段列表（文本、@人、链接）"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return ''.join(segment.get('text', '') if isinstance(segment, dict) else str(segment)
+                       for segment in value)
+    return str(value)
+
+def _to_float(value):
+    if value is None or value == '':
+        return MISSING
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return MISSING
+
+def _to_persons(value):
+    if not value:
+        return ()
+    if isinstance(value, dict):
+        value = [value]
+    return tuple(Person(p.get('id'), p.get('name')) for p in value)
+
+def _to_attachments(value):
+    if not value:
+        return ()
+    return tuple(Attachment(a.get('file_token'), a.get('name'), a.get('size'), a.get('type')) for a in value)
+
+def _to_link_ids(value):
+    """关联字段：新接口为 {"link_record_ids": [...]}，旧接口为 [{"record_ids": [...]}] 或ID列表"""
+    if not value:
+        return ()
+    if isinstance(value, dict):
+        return tuple(value.get('link_record_ids') or value.get('record_ids') or ())
+    ids = []
+    for item in value:
+        if isinstance(item, dict):
+            ids.extend(item.get('record_ids') or item.get('link_record_ids') or ())
+        else:
+            ids.append(item)
+    return tuple(ids)
+
+def _to_url(value):
+    if isinstance(value, dict):
+        return value.get('link')
+    return _segments_text(value)
+
+def _unwrap_formula(value):
+    """查找引用 / 公式字段包装为 {"type": 内层类型, "value": [...]}，返回展开后的值"""
+    if isinstance(value, dict) and 'value' in value:
+        inner = value['value']
+        if isinstance(inner, list) and inner and all(isinstance(v, (int, float)) for v in inner):
+            return inner[0] if len(inner) == 1 else inner
+        if isinstance(inner, list) and all(isinstance(v, dict) and 'text' in v for v in inner):
+            return _segments_text(inner)
+        return inner
+    return value
+
+# 每种字段类型对应 (列容器工厂, 整列转换函数)
+# 转换函数接收一页中该字段的全部原始值，返回可直接 extend 到列容器上的序列
+_NUMERIC = (lambda: array('d'), lambda values: array('d', [_to_float(v) for v in values]))
+_TEXT = (list, lambda values: [_segments_text(v) for v in values])
+
+COLUMN_CODECS: Dict[int, tuple] = {
+    FIELD_TEXT: _TEXT,
+    FIELD_NUMBER: _NUMERIC,
+    FIELD_SINGLE_SELECT: (list, list),
+    FIELD_MULTI_SELECT: (list, lambda values: [tuple(v) if v else () for v in values]),
+    FIELD_DATE: _NUMERIC,
+    FIELD_CHECKBOX: (bytearray, lambda values: bytes(1 if v else 0 for v in values)),
+    FIELD_PERSON: (list, lambda values: [_to_persons(v) for v in values]),
+    FIELD_PHONE: _TEXT,
+    FIELD_URL: (list, lambda values: [_to_url(v) for v in values]),
+    FIELD_ATTACHMENT: (list, lambda values: [_to_attachments(v) for v in values]),
+    FIELD_LINK: (list, lambda values: [_to_link_ids(v) for v in values]),
+    FIELD_DUPLEX_LINK: (list, lambda values: [_to_link_ids(v) for v in values]),
+    FIELD_LOOKUP: (list, lambda values: [_unwrap_formula(v) for v in values]),
+    FIELD_FORMULA: (list, lambda values: [_unwrap_formula(v) for v in values]),
+    FIELD_CREATED_TIME: _NUMERIC,
+    FIELD_MODIFIED_TIME: _NUMERIC,
+    FIELD_CREATED_USER: (list, lambda values: [_to_persons(v) for v in values]),
+    FIELD_MODIFIED_USER: (list, lambda values: [_to_persons(v) for v in values]),
+    FIELD_AUTO_NUMBER: _TEXT,
+}
+
+# 未知类型按原样保留
+_RAW = (list, list)
+
+class TableDecoder:
+    """按字段元数据编译的解码器
+
+    编译时为每个字段选好列容器和转换函数；解码时一页记录按列处理，
+    数字和日期列是 array('d')（缺失值为 NaN），复选框是 bytearray，
+    其余为元素已扁平化的 list，不再保留嵌套的字段字典。
+    """
+
+    def __init__(self, fields: List[Dict[str, Any]]):
+        self.names: List[str] = []
+        self.types: List[int] = []
+        self._codecs: List[tuple] = []
+        for field in fields:
+            name = field.get('field_name') or field.get('name')
+            if not name:
+                continue
+            field_type = field.get('type')
+            self.names.append(name)
+            self.types.append(field_type)
+            self._codecs.append(COLUMN_CODECS.get(field_type, _RAW))
+
+    def new_columns(self) -> Dict[str, Any]:
+        """空的列集合：record_id 列加上每个字段一列"""
+        columns = {'record_id': []}
+        for name, (factory, _) in zip(self.names, self._codecs):
+            columns[name] = factory()
+        return columns
+
+    def decode(self, items: List[Dict[str, Any]], columns: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """把一页记录追加到列集合中（未传入时新建），返回列集合"""
+        if columns is None:
+            columns = self.new_columns()
+        columns['record_id'].extend([item.get('record_id') for item in items])
+        field_dicts = [item.get('fields') or {} for item in items]
+        for name, (_, convert) in zip(self.names, self._codecs):
+            columns[name].extend(convert([fields.get(name) for fields in field_dicts]))
+        return columns
+
+    def decode_pages(self, pages: Iterable[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """逐页解码并累积为一张表的完整列集合"""
+        columns = self.new_columns()
+        for items in pages:
+            self.decode(items, columns)
+        return columns
+
+def compile_decoder(fields: List[Dict[str, Any]]) -> TableDecoder:
+    """根据 get_app_table_info 返回的 fields 编译解码器"""
+    return TableDecoder(fields)
+
+def column_to_json(column) -> list:
+    """把列转换为可 JSON 序列化的列表（NaN 转为 None，命名元组转为字典）"""
+    if isinstance(column, array):
+        return [None if math.isnan(v) else v for v in column]
+    if isinstance(column, (bytes, bytearray)):
+        return [bool(v) for v in column]
+    return [_json_value(v) for v in column]
+
+def _json_value(value):
+    if isinstance(value, tuple):
+        return [v._asdict() if hasattr(v, '_asdict') else v for v in value]
+    return value
+
+def columns_to_json(columns: Dict[str, Any]) -> Dict[str, list]:
+    """整张表的列集合转换为 {列名: 值列表}"""
+    return {name: column_to_json(column) for name, column in columns.items()}
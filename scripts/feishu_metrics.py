@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+飞书接口请求指标
+FeishuAPI 在每次请求、重试、限流等待和翻页时回调指标对象，运行结束后可导出为 JSON
+"""
+
+import re
+import json
+import time
+import bisect
+import threading
+from typing import Dict, Any, Optional
+
+# 延迟直方图的桶上界（毫秒），最后一个桶收纳更慢的请求
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# 把路径中的ID替换为占位符，使同一接口的请求归入同一组
+_ENDPOINT_PATTERNS = [
+    (re.compile(r'/apps/[^/]+'), '/apps/{app_token}'),
+    (re.compile(r'/tables/[^/]+'), '/tables/{table_id}'),
+    (re.compile(r'/records/(?!batch_get$|search$)[^/]+'), '/records/{record_id}'),
+    (re.compile(r'/medias/[^/]+'), '/medias/{file_token}'),
+]
+
+def endpoint_name(method: str, path: str) -> str:
+    """请求方法加归一化后的路径，如 GET /bitable/v1/apps/{app_token}/tables/{table_id}/records"""
+    path = path.split('?', 1)[0]
+    for pattern, replacement in _ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return f"{method.upper()} {path}"
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """按桶估算分位数，返回所在桶的上界（最后一个桶返回最大值）"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+class FeishuMetrics:
+    """线程安全的请求指标收集器
+
+    作为 FeishuAPI / AsyncFeishuAPI 的 metrics 参数传入；也可以继承后重写
+    on_* 方法，把事件转发到其他监控系统。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        self.retries: Dict[str, int] = {}
+        self.rate_limit_waits: Dict[str, Dict[str, float]] = {}
+        self.pages = 0
+        self.records = 0
+
+    def _endpoint(self, endpoint: str) -> Dict[str, Any]:
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = {"requests": 0, "errors": 0, "bytes_sent": 0,
+                                                "bytes_received": 0, "retries": {}, "pages": 0,
+                                                "records": 0, "latency": LatencyHistogram()}
+        return stats
+
+    def on_request(self, endpoint: str, status: int, elapsed: float, bytes_sent: int = 0,
+                   bytes_received: int = 0) -> None:
+        """一次HTTP请求完成（elapsed 为秒，status 为HTTP状态码，0 表示网络异常）"""
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats["requests"] += 1
+            if status == 0 or status >= 400:
+                stats["errors"] += 1
+            stats["bytes_sent"] += bytes_sent
+            stats["bytes_received"] += bytes_received
+            stats["latency"].observe(elapsed * 1000)
+
+    def on_retry(self, endpoint: str, reason: str) -> None:
+        """请求因 reason（token / rate_limit）被重试，按接口和总数分别计数"""
+        with self._lock:
+            retries = self._endpoint(endpoint)["retries"]
+            retries[reason] = retries.get(reason, 0) + 1
+            self.retries[reason] = self.retries.get(reason, 0) + 1
+
+    def on_rate_limit_wait(self, seconds: float, source: str) -> None:
+        """因限流等待了 seconds 秒；source 为 server（429退避）或 client（本地令牌桶）"""
+        with self._lock:
+            waits = self.rate_limit_waits.setdefault(source, {"count": 0, "seconds": 0.0})
+            waits["count"] += 1
+            waits["seconds"] += seconds
+
+    def on_page(self, endpoint: str, items: int) -> None:
+        """取得一页记录，按接口和总数分别计数"""
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats["pages"] += 1
+            stats["records"] += items
+            self.pages += 1
+            self.records += items
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {}
+            for name, stats in sorted(self.endpoints.items()):
+                endpoints[name] = {key: value for key, value in stats.items() if key != "latency"}
+                endpoints[name]["retries"] = dict(stats["retries"])
+                endpoints[name]["latency"] = stats["latency"].to_dict()
+            return {
+                "started_at": self.started_at,
+                "wall_time": round(time.perf_counter() - self._start, 3),
+                "requests": sum(stats["requests"] for stats in self.endpoints.values()),
+                "bytes_received": sum(stats["bytes_received"] for stats in self.endpoints.values()),
+                "pages": self.pages,
+                "records": self.records,
+                "retries": dict(self.retries),
+                "rate_limit_waits": {source: {"count": w["count"], "seconds": round(w["seconds"], 3)}
+                                     for source, w in self.rate_limit_waits.items()},
+                "endpoints": endpoints,
+            }
+
+    def dump(self, path: str) -> None:
+        """把指标写入 JSON 文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
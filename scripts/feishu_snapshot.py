@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+飞书多维表格本地快照
+把表格增量同步到 SQLite，站点构建时直接读取本地快照，不必每次都请求飞书接口
+"""
+
+import json
+import time
+import sqlite3
+from typing import Dict, Any, Optional, List, Tuple
+
+from feishu_table_reader import FeishuAPI, FeishuAPIError, BATCH_GET_SIZE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    app_token TEXT NOT NULL,
+    table_id TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    created_time INTEGER,
+    last_modified_time INTEGER,
+    fields TEXT NOT NULL,
+    PRIMARY KEY (app_token, table_id, record_id)
+);
+CREATE INDEX IF NOT EXISTS records_by_position ON records (app_token, table_id, position);
+CREATE TABLE IF NOT EXISTS sync_state (
+    app_token TEXT NOT NULL,
+    table_id TEXT NOT NULL,
+    watermark INTEGER,
+    synced_at REAL NOT NULL,
+    record_count INTEGER NOT NULL,
+    fields TEXT,
+    PRIMARY KEY (app_token, table_id)
+);
+"""
+
+def open_snapshot(db_path: str) -> sqlite3.Connection:
+    """打开（必要时创建）快照数据库"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def load_sync_state(conn: sqlite3.Connection, app_token: str, table_id: str) -> Optional[Dict[str, Any]]:
+    """读取上次同步的水位线等信息，从未同步过时返回None"""
+    row = conn.execute(
+        "SELECT watermark, synced_at, record_count, fields FROM sync_state WHERE app_token=? AND table_id=?",
+        (app_token, table_id)).fetchone()
+    if row is None:
+        return None
+    return {"watermark": row[0], "synced_at": row[1], "record_count": row[2],
+            "fields": json.loads(row[3]) if row[3] else []}
+
+def _primary_field_name(fields: List[Dict[str, Any]]) -> Optional[str]:
+    """主字段名称（没有 is_primary 标记时取第一个字段）"""
+    for field in fields:
+        if field.get("is_primary"):
+            return field.get("field_name") or field.get("name")
+    if fields:
+        return fields[0].get("field_name") or fields[0].get("name")
+    return None
+
+def _scan_modified_times(api: FeishuAPI, app_token: str, table_id: str,
+                         field_name: Optional[str]) -> List[Tuple[str, Optional[int]]]:
+    """只取主字段和系统字段列出全部记录，返回 [(record_id, last_modified_time)]，保持表格顺序"""
+    field_names = [field_name] if field_name else None
+    return [(record["record_id"], record.get("last_modified_time"))
+            for record in api.iter_records(app_token, table_id, automatic_fields=True, field_names=field_names)]
+
+def _fetch_by_ids(api: FeishuAPI, app_token: str, table_id: str, record_ids: List[str]) -> List[Dict[str, Any]]:
+    """按ID分批获取完整记录"""
+    records = []
+    for start in range(0, len(record_ids), BATCH_GET_SIZE):
+        batch = api.batch_get_records(app_token, table_id, record_ids[start:start + BATCH_GET_SIZE])
+        if batch is None:
+            raise FeishuAPIError(f"批量获取记录失败 (第 {start // BATCH_GET_SIZE + 1} 批)")
+        records.extend(batch)
+    return records
+
+def sync_table(api: FeishuAPI, conn: sqlite3.Connection, app_token: str, table_id: str,
+               full: bool = False) -> Dict[str, Any]:
+    """把一张表同步到快照，返回同步统计
+
+    首次同步（或 full=True）完整拉取全部记录。之后的同步先只带主字段扫描
+    记录ID和 last_modified_time，与本地比较后只通过 batch_get 拉取新增或修改过的记录，
+    本地存在而远端已不存在的记录视为已删除。全部写入在一个事务中完成。
+    """
+    start_time = time.perf_counter()
+    info = api.get_app_table_info(app_token, table_id)
+    if info is None:
+        raise FeishuAPIError("获取表格信息失败")
+    fields = info.get("fields") or []
+
+    local = {record_id: (modified, position) for record_id, modified, position in conn.execute(
+        "SELECT record_id, last_modified_time, position FROM records WHERE app_token=? AND table_id=?",
+        (app_token, table_id))}
+    state = load_sync_state(conn, app_token, table_id)
+
+    if full or state is None or not local:
+        mode = "full"
+        changed = list(api.iter_records(app_token, table_id, automatic_fields=True))
+        remote = [(record["record_id"], record.get("last_modified_time")) for record in changed]
+    else:
+        mode = "incremental"
+        remote = _scan_modified_times(api, app_token, table_id, _primary_field_name(fields))
+        # 没有 last_modified_time 的记录无法判断是否变化，一律重新获取
+        changed_ids = [record_id for record_id, modified in remote
+                       if modified is None or record_id not in local or modified > (local[record_id][0] or 0)]
+        changed = _fetch_by_ids(api, app_token, table_id, changed_ids)
+        # 扫描之后、batch_get 之前被删除的记录取不回来，按已删除处理
+        missing = set(changed_ids) - {record["record_id"] for record in changed}
+        if missing:
+            remote = [(record_id, modified) for record_id, modified in remote if record_id not in missing]
+
+    positions = {record_id: position for position, (record_id, _) in enumerate(remote)}
+    changed_ids = {record["record_id"] for record in changed}
+    deleted = [record_id for record_id in local if record_id not in positions]
+    moved = [(position, app_token, table_id, record_id) for record_id, position in positions.items()
+             if record_id not in changed_ids and local[record_id][1] != position]
+    watermark = max((modified for _, modified in remote if modified is not None), default=None)
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO records (app_token, table_id, record_id, position, created_time, last_modified_time, fields) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (app_token, table_id, record_id) DO UPDATE SET position=excluded.position, "
+            "created_time=excluded.created_time, last_modified_time=excluded.last_modified_time, "
+            "fields=excluded.fields",
+            [(app_token, table_id, record["record_id"], positions.get(record["record_id"], len(positions)),
+              record.get("created_time"), record.get("last_modified_time"),
+              json.dumps(record.get("fields") or {}, ensure_ascii=False)) for record in changed])
+        conn.executemany("UPDATE records SET position=? WHERE app_token=? AND table_id=? AND record_id=?", moved)
+        conn.executemany("DELETE FROM records WHERE app_token=? AND table_id=? AND record_id=?",
+                         [(app_token, table_id, record_id) for record_id in deleted])
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (app_token, table_id, watermark, synced_at, record_count, fields) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (app_token, table_id, watermark, time.time(), len(remote), json.dumps(fields, ensure_ascii=False)))
+
+    inserted = sum(1 for record_id in changed_ids if record_id not in local)
+    return {
+        "mode": mode,
+        "records": len(remote),
+        "fetched": len(changed),
+        "inserted": inserted,
+        "updated": len(changed_ids) - inserted,
+        "deleted": len(deleted),
+        "unchanged": len(remote) - len(changed_ids),
+        "watermark": watermark,
+        "elapsed": time.perf_counter() - start_time,
+    }
+
+def load_snapshot(conn: sqlite3.Connection, app_token: str, table_id: str) -> List[Dict[str, Any]]:
+    """按表格顺序读取快照中的全部记录，格式与接口返回的记录相同"""
+    rows = conn.execute(
+        "SELECT record_id, created_time, last_modified_time, fields FROM records "
+        "WHERE app_token=? AND table_id=? ORDER BY position", (app_token, table_id))
+    return [{"record_id": record_id, "created_time": created, "last_modified_time": modified,
+             "fields": json.loads(fields)} for record_id, created, modified, fields in rows]
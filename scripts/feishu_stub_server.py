@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+飞书开放平台本地桩服务
+模拟鉴权和多维表格接口，用于在本地调试 feishu_table_reader.py 的分页等逻辑
+"""
+
+import gzip
+import json
+import hashlib
+import time
+import socket
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# 飞书列表接口允许的最大分页大小
+MAX_PAGE_SIZE = 500
+
+STUB_FIELDS = [
+    {"field_id": "fld001", "field_name": "标题", "type": 1},
+    {"field_id": "fld002", "field_name": "播放量", "type": 2},
+    {"field_id": "fld003", "field_name": "发布日期", "type": 5},
+    {"field_id": "fld004", "field_name": "封面", "type": 17},
+]
+
+# 示例附件的种类数，记录按序号循环引用，用于验证按 file_token 去重
+STUB_MEDIA_COUNT = 7
+STUB_MEDIA_SIZE = 48 * 1024
+
+
+def media_bytes(file_token):
+    """示例附件内容：由 file_token 决定的确定性字节"""
+    block = hashlib.sha256(file_token.encode()).digest()
+    return (block * (STUB_MEDIA_SIZE // len(block) + 1))[:STUB_MEDIA_SIZE]
+
+
+def make_stub_record(i, modified_time=None):
+    """生成第 i 条示例记录（含系统字段）"""
+    created_time = 1700000000000 + i * 86400000
+    return {
+        "record_id": f"rec{i:08d}",
+        "fields": {
+            "标题": f"作品 {i + 1}",
+            "播放量": i * 10,
+            "发布日期": created_time,
+            "封面": [{"file_token": f"boxStub{i % STUB_MEDIA_COUNT}", "name": f"cover-{i % STUB_MEDIA_COUNT}.png",
+                    "size": STUB_MEDIA_SIZE, "type": "image/png"}],
+        },
+        "created_time": created_time,
+        "last_modified_time": modified_time or created_time,
+    }
+
+
+def make_stub_records(count):
+    """生成指定数量的示例记录"""
+    return [make_stub_record(i) for i in range(count)]
+
+
+def render_record(record, automatic_fields=False, field_names=None):
+    """按请求参数输出记录：默认不带系统字段，field_names 只保留指定字段"""
+    fields = record["fields"]
+    if field_names is not None:
+        fields = {name: value for name, value in fields.items() if name in field_names}
+    rendered = {"record_id": record["record_id"], "fields": fields}
+    if automatic_fields:
+        rendered["created_time"] = record["created_time"]
+        rendered["last_modified_time"] = record["last_modified_time"]
+    return rendered
+
+
+class StubState:
+    """桩服务的数据和请求计数"""
+
+    def __init__(self, record_count=250, app_token="appStub", table_id="tblStub", latency=0.0,
+                 token_ttl=7200, table_count=1, qps_limit=None):
+        self.app_token = app_token
+        self.table_id = table_id
+        self.fields = list(STUB_FIELDS)
+        self.records = make_stub_records(record_count)
+        # 第一张表沿用 table_id，其余依次编号为 tblStub2、tblStub3...
+        self.tables = {table_id: self.records}
+        for n in range(2, table_count + 1):
+            self.tables[f"{table_id}{n}"] = make_stub_records(record_count)
+        self.latency = latency
+        self.token_ttl = token_ttl
+        self.qps_limit = qps_limit
+        self.tokens = {}
+        self.auth_requests = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self._recent = deque()
+        self.lock = threading.Lock()
+
+    def issue_token(self):
+        """签发新令牌"""
+        with self.lock:
+            self.auth_requests += 1
+            token = f"t-stub-{self.auth_requests}"
+            self.tokens[token] = time.monotonic() + self.token_ttl
+        return token
+
+    def token_valid(self, token):
+        """令牌存在且未过期"""
+        with self.lock:
+            return self.tokens.get(token, 0) > time.monotonic()
+
+    def over_limit(self):
+        """按 1 秒滑动窗口判断是否超过 qps_limit，超过时计入 rate_limited"""
+        if not self.qps_limit:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.qps_limit:
+                self.rate_limited += 1
+                return True
+            self._recent.append(now)
+            return False
+
+    def update_record(self, index, table_id=None, **fields):
+        """修改一条记录并刷新其 last_modified_time"""
+        with self.lock:
+            record = self.tables[table_id or self.table_id][index]
+            record["fields"].update(fields)
+            record["last_modified_time"] = max(int(time.time() * 1000), record["last_modified_time"] + 1)
+        return record
+
+    def add_record(self, table_id=None):
+        """在表尾追加一条新记录"""
+        with self.lock:
+            records = self.tables[table_id or self.table_id]
+            record = make_stub_record(len(records) + 10 ** 6, int(time.time() * 1000))
+            records.append(record)
+        return record
+
+    def delete_record(self, record_id, table_id=None):
+        """删除一条记录"""
+        with self.lock:
+            records = self.tables[table_id or self.table_id]
+            records[:] = [record for record in records if record["record_id"] != record_id]
+
+    def revoke_tokens(self):
+        """使已签发的全部令牌失效（模拟服务端提前吊销）"""
+        with self.lock:
+            self.tokens.clear()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """处理飞书接口请求"""
+
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def setup(self):
+        super().setup()
+        # 响应头和响应体分两次写出，长连接下需关闭 Nagle 算法以免触发延迟确认
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        # 客户端支持时压缩较大的响应，与真实服务一致
+        if len(body) > 1024 and 'gzip' in (self.headers.get("Accept-Encoding") or ''):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _count_request(self):
+        with self.state.lock:
+            self.state.requests += 1
+        # 模拟服务端处理耗时
+        if self.state.latency:
+            time.sleep(self.state.latency)
+
+    def do_POST(self):
+        self._count_request()
+        path = urlparse(self.path).path
+        if path == "/open-apis/auth/v3/tenant_access_token/internal/":
+            self._read_body()
+            self._send_json({"code": 0, "msg": "ok", "tenant_access_token": self.state.issue_token(),
+                             "expire": self.state.token_ttl})
+            return
+
+        # /open-apis/bitable/v1/apps/{app_token}/tables/{table_id}/records/batch_get
+        parts = path.strip('/').split('/')
+        body = self._read_body()
+        if len(parts) != 9 or parts[7:] != ["records", "batch_get"]:
+            self._send_json({"code": 404, "msg": "not found"}, status=404)
+            return
+        if not self._authorized():
+            return
+        records = self.state.tables.get(parts[6])
+        if parts[4] != self.state.app_token or records is None:
+            self._send_json({"code": 1254004, "msg": "table not found"})
+            return
+        by_id = {record["record_id"]: record for record in records}
+        found = [render_record(by_id[record_id], body.get("automatic_fields", False))
+                 for record_id in body.get("record_ids", []) if record_id in by_id]
+        self._send_json({"code": 0, "msg": "ok", "data": {"records": found}})
+
+    def _authorized(self):
+        """校验 Authorization 头，失败时返回飞书的令牌无效错误"""
+        token = (self.headers.get("Authorization") or "").replace("Bearer ", "", 1)
+        if self.state.token_valid(token):
+            return True
+        self._send_json({"code": 99991663, "msg": "Invalid access token for authorization"}, status=400)
+        return False
+
+    def do_GET(self):
+        self._count_request()
+        if not self._authorized():
+            return
+        if self.state.over_limit():
+            self._send_json({"code": 99991400, "msg": "request trigger frequency limit"}, status=429,
+                            headers={"x-ogw-ratelimit-reset": "1"})
+            return
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip('/').split('/')
+        query = parse_qs(parsed.query)
+
+        # /open-apis/drive/v1/medias/{file_token}/download
+        if parts[:4] == ["open-apis", "drive", "v1", "medias"] and parts[5:] == ["download"]:
+            self._send_media(parts[4])
+            return
+
+        # /open-apis/bitable/v1/apps/{app_token}/tables/{table_id}[/records]
+        if parts[:4] != ["open-apis", "bitable", "v1", "apps"] or len(parts) < 7:
+            self._send_json({"code": 404, "msg": "not found"}, status=404)
+            return
+        records = self.state.tables.get(parts[6])
+        if parts[4] != self.state.app_token or records is None:
+            self._send_json({"code": 1254004, "msg": "table not found"})
+            return
+
+        if len(parts) == 7:
+            self._send_json({"code": 0, "msg": "ok", "data": {
+                "name": f"桩数据表 {parts[6]}", "description": "本地桩服务", "fields": self.state.fields,
+            }})
+        elif parts[7] == "records":
+            self._send_records(records, query)
+        else:
+            self._send_json({"code": 404, "msg": "not found"}, status=404)
+
+    def _send_media(self, file_token):
+        """返回附件内容，支持 Range 续传"""
+        if not file_token.startswith("boxStub"):
+            self._send_json({"code": 1061044, "msg": "file not found"}, status=404)
+            return
+        body = media_bytes(file_token)
+        start = 0
+        range_header = self.headers.get("Range") or ""
+        if range_header.startswith("bytes="):
+            start = int(range_header[6:].split("-")[0] or 0)
+            if start >= len(body):
+                self._send_json({"code": 416, "msg": "range not satisfiable"}, status=416)
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def _send_records(self, records, query):
+        page_size = int(query.get("page_size", ["20"])[0])
+        if page_size > MAX_PAGE_SIZE:
+            self._send_json({"code": 1254000, "msg": "page_size too large"}, status=400)
+            return
+        start = int(query.get("page_token", ["0"])[0] or 0)
+        automatic_fields = query.get("automatic_fields", ["false"])[0] == "true"
+        field_names = json.loads(query["field_names"][0]) if "field_names" in query else None
+        items = [render_record(record, automatic_fields, field_names)
+                 for record in records[start:start + page_size]]
+        end = start + len(items)
+        has_more = end < len(records)
+        self._send_json({"code": 0, "msg": "ok", "data": {
+            "items": items,
+            "has_more": has_more,
+            "page_token": str(end) if has_more else "",
+            "total": len(records),
+        }})
+
+
+def start_stub_server(record_count=250, host="127.0.0.1", port=0, latency=0.0, token_ttl=7200,
+                      table_count=1, qps_limit=None):
+    """在后台线程启动桩服务，返回 (server, base_url)；port=0 时自动分配端口"""
+    state = StubState(record_count, latency=latency, token_ttl=token_ttl, table_count=table_count,
+                      qps_limit=qps_limit)
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}/open-apis"
+    return server, base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="飞书接口本地桩服务")
+    parser.add_argument("--records", type=int, default=250, help="表格记录数 (默认: 250)")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口 (默认: 8765)")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求模拟的服务端耗时（秒）")
+    parser.add_argument("--tables", type=int, default=1, help="表格数量 (默认: 1)")
+    parser.add_argument("--qps-limit", type=int, help="超过该QPS时返回429，模拟频率限制")
+    parser.add_argument("--token-ttl", type=int, default=7200, help="签发令牌的有效期（秒）(默认: 7200)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.records, port=args.port, latency=args.latency,
+                                         token_ttl=args.token_ttl, table_count=args.tables,
+                                         qps_limit=args.qps_limit)
+    state = server.state
+    print(f"🧪 桩服务已启动: {base_url}")
+    print(f"   App Token: {state.app_token}  Table ID: {', '.join(state.tables)}  记录数: {len(state.records)}")
+    print(f"   export FEISHU_BASE_URL='{base_url}'")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,57 +5,326 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
-from typing import Dict, Any, Optional
+import time
+import random
+import asyncio
+import argparse
+import threading
+from typing import Dict, Any, Optional, Iterator, Tuple, Union, Callable, List, Iterable
+
+from feishu_metrics import FeishuMetrics, endpoint_name
+
+DEFAULT_BASE_URL = "https://open.feishu.cn/open-apis"
+
+# 多维表格列出记录接口允许的最大分页大小
+MAX_PAGE_SIZE = 500
+
+# 批量获取记录接口单次最多查询的记录数
+BATCH_GET_SIZE = 100
+
+# 默认超时：(连接超时, 读取超时)，单位秒
+DEFAULT_TIMEOUT = (5, 30)
+
+# 连接池大小：同一主机最多保持的空闲长连接数
+DEFAULT_POOL_SIZE = 10
+
+# 令牌无效或已过期时飞书返回的错误码
+TOKEN_INVALID_CODES = {99991661, 99991663, 99991668, 99991677}
+
+# 令牌到期前多少秒在后台提前刷新
+TOKEN_REFRESH_MARGIN = 300
+
+# 令牌剩余有效期少于该秒数时，调用方不再使用它而是同步刷新
+TOKEN_MIN_VALIDITY = 30
+
+# 两次刷新之间的最短间隔（秒），有效期很短的令牌也不会被连续刷新
+TOKEN_MIN_REFRESH_DELAY = 1.0
+
+# 触发频率限制时飞书返回的错误码（HTTP 状态码为 429）
+RATE_LIMIT_CODES = {99991400}
+
+# 被限流时最多重试的次数，以及指数退避的基础和上限（秒）
+MAX_RATE_LIMIT_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+# 多维表格接口单应用的默认 QPS 配额，按开放平台后台显示的实际配额调整
+DEFAULT_QPS = 20
+
+# 异步客户端同时在途的请求数
+DEFAULT_CONCURRENCY = 5
+
+class FeishuAPIError(Exception):
+    """飞书接口调用失败"""
+
+class TokenManager:
+    """租户访问令牌的生命周期管理
+
+    记录令牌的过期时间，在到期前 refresh_margin 秒由后台定时器提前刷新；
+    有效期不到 2 倍 refresh_margin 的令牌改为在有效期过半时刷新；
+    同一时刻只有一个线程会去请求鉴权接口（single-flight），其余调用方等待并复用结果。
+    """
+
+    def __init__(self, fetch: Callable[[], Tuple[str, int]], refresh_margin: float = TOKEN_REFRESH_MARGIN,
+                 background: bool = True):
+        self._fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.background = background
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._min_validity = TOKEN_MIN_VALIDITY
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+
+    @property
+    def token(self) -> Optional[str]:
+        """当前持有的令牌（不触发刷新）"""
+        return self._token
+
+    def _is_fresh(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at - self._min_validity
+
+    def get_token(self) -> str:
+        """返回有效令牌；没有令牌或即将过期时同步刷新"""
+        if self._is_fresh():
+            return self._token
+        with self._lock:
+            # 拿到锁后再检查一次：等待期间可能已被其他线程刷新
+            if self._is_fresh():
+                return self._token
+            return self._refresh_locked()
+
+    def refresh(self) -> str:
+        """强制刷新令牌"""
+        with self._lock:
+            return self._refresh_locked()
+
+    def invalidate(self, token: Optional[str]) -> None:
+        """服务端拒绝该令牌时调用，下一次 get_token 会重新获取"""
+        with self._lock:
+            if token is not None and self._token == token:
+                self._token = None
+
+    def close(self) -> None:
+        """停止后台刷新"""
+        with self._lock:
+            self._closed = True
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+    def _refresh_locked(self) -> str:
+        token, expire = self._fetch()
+        self._token = token
+        self._expires_at = time.monotonic() + expire
+        # 有效期很短时按比例收紧，否则令牌一拿到就被视为即将过期
+        self._min_validity = min(TOKEN_MIN_VALIDITY, expire / 4)
+        self._schedule(self.refresh_delay(expire))
+        return token
+
+    def refresh_delay(self, expire: float) -> float:
+        """拿到有效期为 expire 秒的令牌后，过多久在后台刷新"""
+        if expire > 2 * self.refresh_margin:
+            return expire - self.refresh_margin
+        return max(expire / 2, TOKEN_MIN_REFRESH_DELAY)
+
+    def _schedule(self, delay: float) -> None:
+        if not self.background or self._closed:
+            return
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._refresh_locked()
+            except Exception as e:
+                print(f"⚠️  后台刷新令牌失败，稍后重试: {e}")
+                # 令牌仍有效期间定期重试
+                self._schedule(min(30.0, max(TOKEN_MIN_REFRESH_DELAY, (self._expires_at - time.monotonic()) / 2)))
+
+def is_rate_limited(response: requests.Response, data: Dict[str, Any]) -> bool:
+    """响应是否表示触发了频率限制"""
+    return response.status_code == 429 or data.get("code") in RATE_LIMIT_CODES
+
+def rate_limit_delay(response: requests.Response, attempt: int) -> float:
+    """被限流后应等待的秒数
+
+    优先使用服务端给出的 x-ogw-ratelimit-reset / Retry-After，
+    否则按 attempt 做带随机抖动的指数退避。
+    """
+    for header in ("x-ogw-ratelimit-reset", "Retry-After"):
+        value = response.headers.get(header)
+        if value:
+            try:
+                return min(BACKOFF_MAX, max(0.0, float(value)))
+            except ValueError:
+                pass
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    return delay * random.uniform(0.5, 1.0)
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """创建带连接池的会话：复用 TCP/TLS 长连接，并请求 gzip 压缩的响应"""
+    session = requests.Session()
+    # pool_connections 是缓存的主机连接池个数，pool_maxsize 是每个主机的连接数上限
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
 
 class FeishuAPI:
-    def __init__(self, app_id: str, app_secret: str):
+    def __init__(self, app_id: str, app_secret: str, base_url: str = DEFAULT_BASE_URL,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 pool_size: int = DEFAULT_POOL_SIZE, session: Optional[requests.Session] = None,
+                 metrics: Optional[FeishuMetrics] = None):
         self.app_id = app_id
         self.app_secret = app_secret
-        self.access_token = None
-        self.base_url = "https://open.feishu.cn/open-apis"
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = session or create_session(pool_size)
+        self.token_manager = TokenManager(self._fetch_tenant_access_token)
+        # 指标回调对象（见 feishu_metrics.FeishuMetrics），为None时不收集
+        self.metrics = metrics
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """当前的租户访问令牌"""
+        return self.token_manager.token
+
+    def close(self) -> None:
+        """关闭会话，释放连接池中的连接"""
+        self.token_manager.close()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _record(self, method: str, path: str, response: Optional[requests.Response], start_time: float,
+                stream: bool = False) -> None:
+        """把一次请求的耗时和流量报告给指标对象；response 为None表示请求异常"""
+        if self.metrics is None:
+            return
+        elapsed = time.perf_counter() - start_time
+        endpoint = endpoint_name(method, path)
+        if response is None:
+            self.metrics.on_request(endpoint, 0, elapsed)
+            return
+        body = response.request.body if response.request is not None else None
+        received = response.headers.get("Content-Length")
+        if received is None:
+            received = 0 if stream else len(response.content)
+        self.metrics.on_request(endpoint, response.status_code, elapsed, len(body or b''), int(received))
+
+    def _retrying(self, method: str, path: str, reason: str, delay: float = 0.0) -> None:
+        """报告一次重试（以及重试前的限流等待）"""
+        if self.metrics is None:
+            return
+        self.metrics.on_retry(endpoint_name(method, path), reason)
+        if delay:
+            self.metrics.on_rate_limit_wait(delay, "server")
     
-    def get_tenant_access_token(self) -> bool:
-        """获取租户访问令牌"""
+    def _fetch_tenant_access_token(self) -> Tuple[str, int]:
+        """请求鉴权接口，返回 (令牌, 有效期秒数)"""
         url = f"{self.base_url}/auth/v3/tenant_access_token/internal/"
         payload = {
             "app_id": self.app_id,
             "app_secret": self.app_secret
         }
         
+        start_time = time.perf_counter()
         try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("code") == 0:
-                self.access_token = data.get("tenant_access_token")
-                print(f"✅ 成功获取访问令牌")
-                return True
-            else:
-                print(f"❌ 获取令牌失败: {data.get('msg')}")
-                return False
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+        except requests.RequestException:
+            self._record("POST", "/auth/v3/tenant_access_token/internal/", None, start_time)
+            raise
+        self._record("POST", "/auth/v3/tenant_access_token/internal/", response, start_time)
+        response.raise_for_status()
+        data = response.json()
+        
+        if data.get("code") != 0:
+            raise FeishuAPIError(f"获取令牌失败: {data.get('msg')}")
+        return data.get("tenant_access_token"), int(data.get("expire", 7200))
+
+    def get_tenant_access_token(self) -> bool:
+        """获取租户访问令牌"""
+        try:
+            self.token_manager.refresh()
+            print(f"✅ 成功获取访问令牌")
+            return True
+        except FeishuAPIError as e:
+            print(f"❌ {e}")
+            return False
         except Exception as e:
             print(f"❌ 请求异常: {e}")
             return False
-    
-    def get_app_table_info(self, app_token: str, table_id: str) -> Optional[Dict[str, Any]]:
-        """获取应用表格信息"""
-        if not self.access_token:
-            if not self.get_tenant_access_token():
-                return None
-        
-        url = f"{self.base_url}/bitable/v1/apps/{app_token}/tables/{table_id}"
+
+    def _send(self, method: str, path: str, **kwargs) -> Tuple[str, requests.Response, Dict[str, Any]]:
+        """发送一次带鉴权的请求，返回 (所用令牌, 响应, 响应JSON)，不做任何重试"""
+        token = self.token_manager.get_token()
         headers = {
-            "Authorization": f"Bearer {self.access_token}",
+            "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
         }
-        
+        start_time = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", headers=headers,
+                                            timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            self._record(method, path, None, start_time)
+            raise
+        self._record(method, path, response, start_time)
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
             data = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise
+        return token, response, data
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """发送带鉴权的请求并返回响应JSON
+
+        令牌被判定无效时刷新后重试一次；触发频率限制时按服务端提示或指数退避等待后重试。
+        """
+        token_retried = False
+        rate_limit_attempt = 0
+        while True:
+            token, response, data = self._send(method, path, **kwargs)
+
+            if data.get("code") in TOKEN_INVALID_CODES and not token_retried:
+                token_retried = True
+                self.token_manager.invalidate(token)
+                self._retrying(method, path, "token")
+                continue
+            if is_rate_limited(response, data) and rate_limit_attempt < MAX_RATE_LIMIT_RETRIES:
+                delay = rate_limit_delay(response, rate_limit_attempt)
+                self._retrying(method, path, "rate_limit", delay)
+                time.sleep(delay)
+                rate_limit_attempt += 1
+                continue
+            if response.status_code >= 400 and not data.get("code"):
+                response.raise_for_status()
+            return data
+    
+    def get_app_table_info(self, app_token: str, table_id: str) -> Optional[Dict[str, Any]]:
+        """获取应用表格信息"""
+        try:
+            data = self._request("GET", f"/bitable/v1/apps/{app_token}/tables/{table_id}")
             
             if data.get("code") == 0:
                 return data.get("data")
@@ -66,25 +335,26 @@ class FeishuAPI:
             print(f"❌ 请求异常: {e}")
             return None
     
-    def get_table_records(self, app_token: str, table_id: str, page_size: int = 100) -> Optional[Dict[str, Any]]:
-        """获取表格记录"""
-        if not self.access_token:
-            if not self.get_tenant_access_token():
-                return None
-        
-        url = f"{self.base_url}/bitable/v1/apps/{app_token}/tables/{table_id}/records"
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json"
-        }
+    def get_table_records(self, app_token: str, table_id: str, page_size: int = 100,
+                          page_token: Optional[str] = None, automatic_fields: bool = False,
+                          field_names: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """获取表格记录（单页），返回的数据中包含 has_more 和 page_token
+
+        automatic_fields 为True时每条记录附带 created_time / last_modified_time；
+        field_names 只返回指定字段，用于轻量扫描。
+        """
         params = {
             "page_size": page_size
         }
+        if page_token:
+            params["page_token"] = page_token
+        if automatic_fields:
+            params["automatic_fields"] = "true"
+        if field_names is not None:
+            params["field_names"] = json.dumps(field_names, ensure_ascii=False)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._request("GET", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records", params=params)
             
             if data.get("code") == 0:
                 return data.get("data")
@@ -95,6 +365,246 @@ class FeishuAPI:
             print(f"❌ 请求异常: {e}")
             return None
 
+    def batch_get_records(self, app_token: str, table_id: str, record_ids: List[str],
+                          automatic_fields: bool = True) -> Optional[List[Dict[str, Any]]]:
+        """按记录ID批量获取记录（单次最多 BATCH_GET_SIZE 条）"""
+        payload = {"record_ids": list(record_ids), "automatic_fields": automatic_fields}
+        try:
+            data = self._request("POST", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records/batch_get",
+                                 json=payload)
+
+            if data.get("code") == 0:
+                return (data.get("data") or {}).get("records") or []
+            else:
+                print(f"❌ 批量获取记录失败: {data.get('msg')}")
+                return None
+        except Exception as e:
+            print(f"❌ 请求异常: {e}")
+            return None
+
+    def download_media(self, file_token: str, offset: int = 0,
+                       extra: Optional[str] = None) -> requests.Response:
+        """以流式方式请求附件内容，offset 大于0时通过 Range 头从断点继续
+
+        返回未读取响应体的 Response（调用方负责关闭）；令牌失效和频率限制的重试规则与 _request 相同，
+        其他错误抛出 FeishuAPIError。
+        """
+        path = f"/drive/v1/medias/{file_token}/download"
+        url = f"{self.base_url}{path}"
+        params = {"extra": extra} if extra else None
+        token_retried = False
+        rate_limit_attempt = 0
+        while True:
+            token = self.token_manager.get_token()
+            headers = {"Authorization": f"Bearer {token}"}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+            start_time = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout, stream=True)
+            except requests.RequestException:
+                self._record("GET", path, None, start_time)
+                raise
+            self._record("GET", path, response, start_time, stream=True)
+            if response.status_code in (200, 206):
+                return response
+
+            try:
+                data = response.json()
+            except ValueError:
+                data = {}
+            finally:
+                response.close()
+            if data.get("code") in TOKEN_INVALID_CODES and not token_retried:
+                token_retried = True
+                self.token_manager.invalidate(token)
+                self._retrying("GET", path, "token")
+                continue
+            if is_rate_limited(response, data) and rate_limit_attempt < MAX_RATE_LIMIT_RETRIES:
+                delay = rate_limit_delay(response, rate_limit_attempt)
+                self._retrying("GET", path, "rate_limit", delay)
+                time.sleep(delay)
+                rate_limit_attempt += 1
+                continue
+            if response.status_code == 416:
+                # 断点已在文件末尾之后，交由调用方从头下载
+                return response
+            raise FeishuAPIError(f"下载附件失败 (HTTP {response.status_code}): {data.get('msg', response.reason)}")
+
+    def iter_record_pages(self, app_token: str, table_id: str, page_size: int = MAX_PAGE_SIZE,
+                          **options) -> Iterator[List[Dict[str, Any]]]:
+        """逐页产出表格记录，按 page_token 惰性翻页
+
+        每次只在内存中保留一页数据；请求失败时抛出 FeishuAPIError，避免结果被静默截断。
+        options 透传给 get_table_records（automatic_fields、field_names）。
+        """
+        page_token = None
+        while True:
+            data = self.get_table_records(app_token, table_id, page_size=page_size, page_token=page_token,
+                                          **options)
+            if data is None:
+                raise FeishuAPIError(f"获取表格记录失败 (page_token={page_token})")
+
+            items = data.get("items") or []
+            if self.metrics is not None:
+                self.metrics.on_page(endpoint_name("GET", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records"),
+                                     len(items))
+            yield items
+
+            page_token = data.get("page_token")
+            if not data.get("has_more") or not page_token:
+                return
+
+    def iter_records(self, app_token: str, table_id: str, page_size: int = MAX_PAGE_SIZE,
+                     **options) -> Iterator[Dict[str, Any]]:
+        """逐条产出表格的全部记录，参数同 iter_record_pages"""
+        for items in self.iter_record_pages(app_token, table_id, page_size, **options):
+            yield from items
+
+class AsyncRateLimiter:
+    """asyncio 令牌桶限流器：平均每秒 rate 次，最多允许 burst 次突发"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> float:
+        """取得一次请求配额，返回为此等待的秒数；等待者按到达顺序放行"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def pause(self, delay: float) -> None:
+        """服务端已限流：delay 秒内不再放行任何请求，并清空积攒的突发配额"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        self._tokens = 0.0
+
+class AsyncFeishuAPI:
+    """FeishuAPI 的 asyncio 版本，用于并发读取多张多维表格
+
+    HTTP 请求复用同步客户端的连接池和令牌管理，放到线程中执行；
+    concurrency 限制同时在途的请求数，令牌桶把请求速率控制在 qps 以内，
+    遇到 429 时整体暂停放行并用 asyncio.sleep 退避，退避期间不占用并发名额。
+    """
+
+    def __init__(self, app_id: str, app_secret: str, base_url: str = DEFAULT_BASE_URL,
+                 concurrency: int = DEFAULT_CONCURRENCY, qps: float = DEFAULT_QPS,
+                 timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 api: Optional[FeishuAPI] = None, metrics: Optional[FeishuMetrics] = None):
+        self.api = api or FeishuAPI(app_id, app_secret, base_url, timeout=timeout,
+                                    pool_size=max(concurrency, DEFAULT_POOL_SIZE), metrics=metrics)
+        self.concurrency = concurrency
+        self.limiter = AsyncRateLimiter(qps)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def close(self) -> None:
+        self.api.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """与 FeishuAPI._request 相同的重试规则，等待改为异步"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        token_retried = False
+        rate_limit_attempt = 0
+        while True:
+            async with self._semaphore:
+                waited = await self.limiter.acquire()
+                if waited and self.api.metrics is not None:
+                    self.api.metrics.on_rate_limit_wait(waited, "client")
+                token, response, data = await asyncio.to_thread(self.api._send, method, path, **kwargs)
+
+            if data.get("code") in TOKEN_INVALID_CODES and not token_retried:
+                token_retried = True
+                self.api.token_manager.invalidate(token)
+                self.api._retrying(method, path, "token")
+                continue
+            if is_rate_limited(response, data) and rate_limit_attempt < MAX_RATE_LIMIT_RETRIES:
+                delay = rate_limit_delay(response, rate_limit_attempt)
+                self.api._retrying(method, path, "rate_limit", delay)
+                self.limiter.pause(delay)
+                rate_limit_attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            if response.status_code >= 400 and not data.get("code"):
+                response.raise_for_status()
+            return data
+
+    async def _get_data(self, path: str, action: str, **kwargs) -> Dict[str, Any]:
+        data = await self._request("GET", path, **kwargs)
+        if data.get("code") != 0:
+            raise FeishuAPIError(f"{action}失败: {data.get('msg')}")
+        return data.get("data") or {}
+
+    async def get_app_table_info(self, app_token: str, table_id: str) -> Dict[str, Any]:
+        """获取应用表格信息，失败时抛出 FeishuAPIError"""
+        return await self._get_data(f"/bitable/v1/apps/{app_token}/tables/{table_id}", "获取表格信息")
+
+    async def get_table_records(self, app_token: str, table_id: str, page_size: int = MAX_PAGE_SIZE,
+                                page_token: Optional[str] = None) -> Dict[str, Any]:
+        """获取表格记录（单页），失败时抛出 FeishuAPIError"""
+        params = {"page_size": page_size}
+        if page_token:
+            params["page_token"] = page_token
+        return await self._get_data(f"/bitable/v1/apps/{app_token}/tables/{table_id}/records",
+                                    "获取表格记录", params=params)
+
+    async def fetch_records(self, app_token: str, table_id: str,
+                            page_size: int = MAX_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """获取一张表的全部记录（表内按 page_token 顺序翻页）"""
+        records = []
+        page_token = None
+        while True:
+            data = await self.get_table_records(app_token, table_id, page_size, page_token)
+            items = data.get("items") or []
+            if self.api.metrics is not None:
+                self.api.metrics.on_page(endpoint_name("GET", f"/bitable/v1/apps/{app_token}/tables/{table_id}/records"),
+                                         len(items))
+            records.extend(items)
+            page_token = data.get("page_token")
+            if not data.get("has_more") or not page_token:
+                return records
+
+    async def fetch_table(self, app_token: str, table_id: str) -> Dict[str, Any]:
+        """同时获取一张表的元数据和全部记录；失败记录在 error 中而不抛出，不影响其他表"""
+        start_time = time.perf_counter()
+        result = {"app_token": app_token, "table_id": table_id, "info": None, "records": [], "error": None}
+        try:
+            result["info"], result["records"] = await asyncio.gather(
+                self.get_app_table_info(app_token, table_id),
+                self.fetch_records(app_token, table_id))
+        except Exception as e:
+            result["error"] = str(e)
+        result["elapsed"] = time.perf_counter() - start_time
+        return result
+
+    async def fetch_tables(self, tables: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """并发获取多张表，结果顺序与输入一致；总耗时取决于最慢的一张表"""
+        return await asyncio.gather(*(self.fetch_table(app_token, table_id) for app_token, table_id in tables))
+
 def parse_feishu_url(url: str) -> tuple:
     """解析飞书URL，提取app_token和table_id"""
     # 示例URL: https://o09zn2bdfc.feishu.cn/base/EnETbvJwDaDkV8sJDFEcrQjon9f?table=tbl5j64icKKRE1Zb&view=vew4H4LPnN
@@ -110,10 +620,128 @@ def parse_feishu_url(url: str) -> tuple:
         print(f"❌ URL解析失败: {e}")
         return None, None
 
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="读取飞书多维表格")
+    parser.add_argument("urls", nargs="*", metavar="url",
+                        default=["https://o09zn2bdfc.feishu.cn/base/EnETbvJwDaDkV8sJDFEcrQjon9f?table=tbl5j64icKKRE1Zb&view=vew4H4LPnN"],
+                        help="飞书多维表格URL，传入多个时并发读取")
+    parser.add_argument("--export", help="把全部记录逐条导出为 JSON Lines 文件")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"多表读取时同时在途的请求数 (默认: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--qps", type=float, default=DEFAULT_QPS,
+                        help=f"多表读取时每秒最多发出的请求数 (默认: {DEFAULT_QPS})")
+    parser.add_argument("--columns", metavar="PATH",
+                        help="按字段类型解码为列数组，导出为 {列名: 值列表} 的 JSON 文件")
+    parser.add_argument("--metrics", metavar="PATH", help="运行结束后把请求指标导出为 JSON 文件")
+    parser.add_argument("--sync", metavar="DB", help="把表格增量同步到 SQLite 快照文件")
+    parser.add_argument("--full", action="store_true", help="与 --sync 一起使用，忽略已有快照完整重新同步")
+    return parser.parse_args(argv)
+
+def load_credentials() -> Tuple[Optional[str], Optional[str]]:
+    """从环境变量读取凭据，缺失时打印设置说明"""
+    app_id = os.getenv("FEISHU_APP_ID")
+    app_secret = os.getenv("FEISHU_APP_SECRET")
+    
+    if not app_id or not app_secret:
+        print("❌ 缺少飞书开放平台凭据")
+        print("请设置环境变量:")
+        print("   export FEISHU_APP_ID='your_app_id'")
+        print("   export FEISHU_APP_SECRET='your_app_secret'")
+        print("\n或者直接在脚本中提供凭据")
+        return None, None
+    return app_id, app_secret
+
+async def fetch_many(tables: List[Tuple[str, str]], app_id: str, app_secret: str, args,
+                     metrics: Optional[FeishuMetrics] = None) -> None:
+    """并发读取多张表并打印每张表的结果"""
+    start_time = time.perf_counter()
+    async with AsyncFeishuAPI(app_id, app_secret, os.getenv("FEISHU_BASE_URL", DEFAULT_BASE_URL),
+                              concurrency=args.concurrency, qps=args.qps, metrics=metrics) as client:
+        results = await client.fetch_tables(tables)
+    wall_time = time.perf_counter() - start_time
+
+    export_file = open(args.export, 'w', encoding='utf-8') if args.export else None
+    try:
+        for result in results:
+            if result["error"]:
+                print(f"❌ {result['table_id']}: {result['error']}")
+                continue
+            name = (result["info"] or {}).get("name")
+            print(f"✅ {result['table_id']} ({name}): {len(result['records'])} 条记录 ({result['elapsed']:.2f}秒)")
+            if export_file:
+                for record in result["records"]:
+                    row = {"app_token": result["app_token"], "table_id": result["table_id"], **record}
+                    export_file.write(json.dumps(row, ensure_ascii=False) + "\n")
+    finally:
+        if export_file:
+            export_file.close()
+
+    slowest = max((r["elapsed"] for r in results), default=0.0)
+    print(f"\n📊 共 {len(results)} 张表, {sum(len(r['records']) for r in results)} 条记录")
+    print(f"⏱️  总耗时: {wall_time:.2f} 秒 (最慢的一张表 {slowest:.2f} 秒)")
+    if args.export:
+        print(f"💾 已导出到: {args.export}")
+
+def sync_snapshot(tables: List[Tuple[str, str]], app_id: str, app_secret: str, args,
+                  metrics: Optional[FeishuMetrics] = None) -> None:
+    """把每张表增量同步到 SQLite 快照并打印变更统计"""
+    from feishu_snapshot import open_snapshot, sync_table
+
+    conn = open_snapshot(args.sync)
+    try:
+        with FeishuAPI(app_id, app_secret, os.getenv("FEISHU_BASE_URL", DEFAULT_BASE_URL),
+                       metrics=metrics) as feishu_api:
+            for app_token, table_id in tables:
+                try:
+                    stats = sync_table(feishu_api, conn, app_token, table_id, full=args.full)
+                except FeishuAPIError as e:
+                    print(f"❌ {table_id}: {e}")
+                    continue
+                mode = "完整同步" if stats["mode"] == "full" else "增量同步"
+                print(f"✅ {table_id} {mode}: {stats['records']} 条记录, 新增 {stats['inserted']}, "
+                      f"修改 {stats['updated']}, 删除 {stats['deleted']}, 未变 {stats['unchanged']} "
+                      f"({stats['elapsed']:.2f}秒)")
+    finally:
+        conn.close()
+    print(f"💾 快照已保存到: {args.sync}")
+
 def main():
     """主函数"""
+    args = parse_args()
+    metrics = FeishuMetrics() if args.metrics else None
+    try:
+        run(args, metrics)
+    finally:
+        if metrics:
+            metrics.dump(args.metrics)
+            summary = metrics.to_dict()
+            print(f"📈 {summary['requests']} 次请求, {summary['pages']} 页, "
+                  f"重试 {sum(summary['retries'].values())} 次, 指标已导出到: {args.metrics}")
+
+def run(args, metrics: Optional[FeishuMetrics] = None):
+    """按命令行参数执行读取、并发读取或同步"""
+    if len(args.urls) > 1 or args.sync:
+        tables = []
+        for url in args.urls:
+            app_token, table_id = parse_feishu_url(url)
+            if not app_token or not table_id:
+                print(f"❌ 无法解析飞书URL: {url}")
+                return
+            tables.append((app_token, table_id))
+        if args.sync:
+            app_id, app_secret = load_credentials()
+            if app_id:
+                sync_snapshot(tables, app_id, app_secret, args, metrics)
+            return
+        print(f"📋 并发读取 {len(tables)} 张表 (并发 {args.concurrency}, QPS {args.qps:g})")
+        app_id, app_secret = load_credentials()
+        if app_id:
+            asyncio.run(fetch_many(tables, app_id, app_secret, args, metrics))
+        return
+
     # 飞书表格URL
-    feishu_url = "https://o09zn2bdfc.feishu.cn/base/EnETbvJwDaDkV8sJDFEcrQjon9f?table=tbl5j64icKKRE1Zb&view=vew4H4LPnN"
+    feishu_url = args.urls[0]
     
     # 解析URL
     app_token, table_id = parse_feishu_url(feishu_url)
@@ -126,19 +754,12 @@ def main():
     print(f"   Table ID: {table_id}")
     
     # 检查环境变量中的凭据
-    app_id = os.getenv("FEISHU_APP_ID")
-    app_secret = os.getenv("FEISHU_APP_SECRET")
-    
-    if not app_id or not app_secret:
-        print("❌ 缺少飞书开放平台凭据")
-        print("请设置环境变量:")
-        print("   export FEISHU_APP_ID='your_app_id'")
-        print("   export FEISHU_APP_SECRET='your_app_secret'")
-        print("\n或者直接在脚本中提供凭据")
+    app_id, app_secret = load_credentials()
+    if not app_id:
         return
     
-    # 创建API客户端
-    feishu_api = FeishuAPI(app_id, app_secret)
+    # 创建API客户端（可通过 FEISHU_BASE_URL 指向本地桩服务）
+    feishu_api = FeishuAPI(app_id, app_secret, os.getenv("FEISHU_BASE_URL", DEFAULT_BASE_URL), metrics=metrics)
     
     # 获取表格信息
     print(f"\n📊 获取表格信息...")
@@ -157,28 +778,48 @@ def main():
             field_type = field.get('type', '未知')
             print(f"   - {field_name} ({field_type})")
     
-    # 获取表格记录
+    # 获取表格记录（逐页流式读取，不缓存全部记录）
     print(f"\n📄 获取表格记录...")
-    records_data = feishu_api.get_table_records(app_token, table_id)
-    
-    if records_data:
-        records = records_data.get('items', [])
-        total_count = records_data.get('total', 0)
-        print(f"📊 总记录数: {total_count}")
-        print(f"📋 当前页记录数: {len(records)}")
-        
-        if records:
-            print(f"\n📝 前5条记录预览:")
-            for i, record in enumerate(records[:5]):
-                print(f"   记录 {i+1}:")
-                fields = record.get('fields', {})
-                for key, value in fields.items():
-                    print(f"      {key}: {value}")
-                print()
-        else:
-            print("📝 表格中没有记录")
-    else:
-        print("❌ 无法获取表格记录")
+    export_file = open(args.export, 'w', encoding='utf-8') if args.export else None
+    decoder = columns = None
+    if args.columns:
+        from feishu_decoder import compile_decoder
+        decoder = compile_decoder((table_info or {}).get('fields', []))
+        columns = decoder.new_columns()
+    record_count = 0
+    try:
+        for items in feishu_api.iter_record_pages(app_token, table_id):
+            if decoder:
+                # 整页按列解码，而不是逐条处理字段字典
+                decoder.decode(items, columns)
+            for record in items:
+                record_count += 1
+                if record_count <= 5:
+                    if record_count == 1:
+                        print(f"\n📝 前5条记录预览:")
+                    print(f"   记录 {record_count}:")
+                    fields = record.get('fields', {})
+                    for key, value in fields.items():
+                        print(f"      {key}: {value}")
+                    print()
+                if export_file:
+                    export_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except FeishuAPIError as e:
+        print(f"❌ {e}")
+    finally:
+        if export_file:
+            export_file.close()
+
+    print(f"📊 总记录数: {record_count}")
+    if record_count == 0:
+        print("📝 表格中没有记录")
+    elif args.export:
+        print(f"💾 已导出到: {args.export}")
+    if decoder:
+        from feishu_decoder import columns_to_json
+        with open(args.columns, 'w', encoding='utf-8') as f:
+            json.dump(columns_to_json(columns), f, ensure_ascii=False)
+        print(f"💾 已按 {len(decoder.names)} 个字段导出列数据到: {args.columns}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,83 +3,83 @@
 简化版页面分析脚本
 """
 
-import requests
-import re
+from site_verifier import parse_args, verify_from_args, print_results
+
+def check_page(page):
+    """简单分析单个页面状态，返回关键元素是否齐全"""
+    html = page.html
+    document = page.document
+
+    # 检查关键元素
+    checks = [
+        ("标题", "杜亚楠" in html),
+        ("CSS类", document.has_class("bg-background")),
+        ("CSS变量", document.has_class("text-foreground")),
+        ("布局", document.has_class("max-w-7xl")),
+        ("导航", document.has_tag("nav")),
+        ("内容区块", document.has_tag("section")),
+    ]
+
+    print("\n📋 关键元素检查:")
+    for name, ok in checks:
+        if ok:
+            print(f"✅ {name}")
+        else:
+            print(f"❌ {name}")
+
+    # 检查CSS
+    if page.css_ok:
+        css = page.css_content
+        print(f"✅ CSS文件可访问 ({len(css)} 字节)")
+
+        stylesheet = page.stylesheet
+        css_checks = [
+            ("CSS变量", stylesheet.defines("--background")),
+            ("主题配置", stylesheet.has_at_rule("theme", "inline")),
+            ("Body样式", stylesheet.has_rule("body")),
+        ]
 
-def simple_analysis():
-    """简单分析页面状态"""
-    url = "http://localhost:3000"
+        for name, ok in css_checks:
+            if ok:
+                print(f"✅ {name}")
+            else:
+                print(f"❌ {name}")
+    else:
+        statuses = [str(status) for status, _ in page.stylesheets.values() if status != 200]
+        print(f"❌ CSS文件无法访问: {', '.join(statuses) or '未引用样式表'}")
+
+    # 简单评估
+    print("\n🎯 评估:")
+    all_good = all([
+        "杜亚楠" in html,
+        document.has_class("bg-background"),
+        document.has_class("text-foreground"),
+        document.has_tag("nav"),
+        page.css_ok
+    ])
+
+    if all_good:
+        print("✅ 页面结构和样式应该正常")
+    else:
+        print("❌ 页面可能存在问题")
+    return all_good
+
+def simple_analysis(args=None):
+    """简单分析全部页面状态"""
+    args = args or parse_args("页面快速分析", [])
 
     print("🔍 页面快速分析...")
     print("=" * 50)
 
     try:
-        # 获取页面
-        response = requests.get(url, timeout=10)
-        print(f"✅ 页面响应: {response.status_code}")
-
-        if response.status_code != 200:
-            return False
-
-        html = response.text
-
-        # 检查关键元素
-        checks = [
-            ("标题", "杜亚楠"),
-            ("CSS类", "bg-background"),
-            ("CSS变量", "text-foreground"),
-            ("布局", "max-w-7xl"),
-            ("导航", "<nav"),
-            ("内容区块", "<section"),
-        ]
+        _, results = verify_from_args([check_page], args)
+        print_results(results)
 
-        print("\n📋 关键元素检查:")
-        for name, pattern in checks:
-            if pattern in html:
-                print(f"✅ {name}")
-            else:
-                print(f"❌ {name}")
-
-        # 检查CSS
-        css_url = "http://localhost:3000/_next/static/css/app/layout.css"
-        css_response = requests.get(css_url, timeout=10)
-
-        if css_response.status_code == 200:
-            print(f"✅ CSS文件可访问 ({len(css_response.text)} 字节)")
-            css = css_response.text
-
-            css_checks = [
-                ("CSS变量", "--background:"),
-                ("主题配置", "@theme inline"),
-                ("Body样式", "body {"),
-            ]
-
-            for name, pattern in css_checks:
-                if pattern in css:
-                    print(f"✅ {name}")
-                else:
-                    print(f"❌ {name}")
-        else:
-            print(f"❌ CSS文件无法访问: {css_response.status_code}")
-
-        # 简单评估
-        print("\n🎯 评估:")
-        all_good = all([
-            "杜亚楠" in html,
-            "bg-background" in html,
-            "text-foreground" in html,
-            "<nav" in html,
-            css_response.status_code == 200
-        ])
-
-        if all_good:
-            print("✅ 页面结构和样式应该正常")
+        if results and all(results.values()):
             print("💡 如果浏览器显示异常，建议:")
             print("   • 硬刷新页面 (Ctrl+F5)")
             print("   • 清除浏览器缓存")
             print("   • 检查浏览器开发者工具")
-        else:
-            print("❌ 页面可能存在问题")
 
         return True
 
@@ -88,4 +88,4 @@ def simple_analysis():
         return False
 
 if __name__ == "__main__":
-    simple_analysis()
\ No newline at end of file
+    simple_analysis(parse_args("页面快速分析"))
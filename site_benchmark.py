@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+站点延迟与传输量基准测试
+用站点验证模块发现全部路由和它们引用的静态资源，预热后按给定并发反复请求，
+统计每个地址的首字节时间(TTFB)、总耗时和传输字节数，结果可保存为JSON并与上一次比较
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from urllib.parse import urlparse
+
+import requests
+
+from site_verifier import SiteVerifier, add_arguments, page_assets
+
+DEFAULT_ITERATIONS = 20
+DEFAULT_WARMUP = 1
+
+# 比较时指标变慢/变大超过该百分比记为退化
+DEFAULT_THRESHOLD = 10.0
+
+# 耗时变化小于该毫秒数时不算退化，避免本机抖动造成误报
+DEFAULT_MIN_DELTA_MS = 5.0
+
+CHUNK_SIZE = 64 * 1024
+
+PERCENTILES = (50, 95, 99)
+
+# 参与比较的指标：(结果中的路径, 显示名称, 是否为耗时)
+COMPARED_METRICS = [
+    (("total", "p50"), "总耗时p50", True),
+    (("total", "p95"), "总耗时p95", True),
+    (("ttfb", "p50"), "TTFB p50", True),
+    (("bytes",), "传输字节", False),
+]
+
+def percentile(samples, pct):
+    """计算百分位数（最近秩法）"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(samples):
+    """一组耗时（秒）的统计，单位毫秒"""
+    if not samples:
+        return {}
+    summary = {f"p{pct}": round(percentile(samples, pct) * 1000, 2) for pct in PERCENTILES}
+    summary["mean"] = round(statistics.mean(samples) * 1000, 2)
+    return summary
+
+class Sample:
+    """一次请求的测量结果"""
+
+    __slots__ = ("status", "ttfb", "total", "size", "error")
+
+    def __init__(self, status=None, ttfb=0.0, total=0.0, size=0, error=None):
+        self.status = status
+        self.ttfb = ttfb
+        self.total = total
+        self.size = size
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None and self.status is not None and self.status < 400
+
+class SiteBenchmark(SiteVerifier):
+    """在站点验证器的会话和并发控制上反复请求并计时
+
+    TTFB 为发出请求到收到响应头的时间；传输字节按线上原始字节计（不解压），
+    与浏览器 Network 面板的 transferred 一致。
+    """
+
+    def _timed_get(self, url):
+        start_time = time.perf_counter()
+        try:
+            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                ttfb = time.perf_counter() - start_time
+                size = sum(len(chunk) for chunk in response.raw.stream(CHUNK_SIZE, decode_content=False))
+                return Sample(response.status_code, ttfb, time.perf_counter() - start_time, size)
+        except requests.RequestException as e:
+            return Sample(total=time.perf_counter() - start_time, error=str(e))
+
+    async def measure(self, url):
+        async with self._semaphore:
+            return await asyncio.to_thread(self._timed_get, url)
+
+    async def run(self, urls, iterations, warmup=DEFAULT_WARMUP):
+        """预热 warmup 轮后测量 iterations 轮，返回 ({地址: [Sample]}, 测量耗时秒数)"""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        for _ in range(warmup):
+            await asyncio.gather(*(self.measure(url) for url in urls))
+
+        start_time = time.perf_counter()
+        tasks = [(url, self.measure(url)) for _ in range(iterations) for url in urls]
+        results = await asyncio.gather(*(task for _, task in tasks))
+        elapsed = time.perf_counter() - start_time
+
+        samples = {url: [] for url in urls}
+        for (url, _), sample in zip(tasks, results):
+            samples[url].append(sample)
+        return samples, elapsed
+
+def discover_targets(verifier, routes=None, include_assets=True):
+    """抓取一遍站点，返回 {地址: (类型, 首次引用它的路由)}，页面在前、静态资源在后"""
+    pages = verifier.crawl_sync(routes)
+    targets = {page.url: ("page", page.route) for page in pages}
+    if include_assets:
+        for page in pages:
+            if page.ok:
+                for url, kind in page_assets(page).items():
+                    targets.setdefault(url, (kind, page.route))
+    return targets
+
+def target_key(url):
+    """结果中的键：去掉协议和主机，便于比较不同地址上的两次运行"""
+    parsed = urlparse(url)
+    return parsed.path + (f"?{parsed.query}" if parsed.query else "")
+
+def build_report(targets, samples, elapsed, args):
+    """把测量结果整理为可保存的字典"""
+    report = {
+        "base_url": args.base_url,
+        "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "concurrency": args.concurrency,
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "elapsed": round(elapsed, 3),
+        "targets": {},
+        "kinds": {},
+    }
+
+    total_requests = 0
+    errors = 0
+    for url, (kind, route) in targets.items():
+        url_samples = samples[url]
+        ok = [sample for sample in url_samples if sample.ok]
+        total_requests += len(url_samples)
+        errors += len(url_samples) - len(ok)
+        report["targets"][target_key(url)] = {
+            "kind": kind,
+            "route": route,
+            "requests": len(url_samples),
+            "errors": len(url_samples) - len(ok),
+            "status": url_samples[-1].status if url_samples else None,
+            "bytes": max((sample.size for sample in ok), default=0),
+            "ttfb": summarize([sample.ttfb for sample in ok]),
+            "total": summarize([sample.total for sample in ok]),
+        }
+
+    # 按资源类型汇总：字节数为该类资源各请求一次的总和
+    for kind in dict.fromkeys(kind for kind, _ in targets.values()):
+        kind_urls = [url for url, (url_kind, _) in targets.items() if url_kind == kind]
+        kind_samples = [sample for url in kind_urls for sample in samples[url] if sample.ok]
+        report["kinds"][kind] = {
+            "targets": len(kind_urls),
+            "bytes": sum(report["targets"][target_key(url)]["bytes"] for url in kind_urls),
+            "ttfb": summarize([sample.ttfb for sample in kind_samples]),
+            "total": summarize([sample.total for sample in kind_samples]),
+        }
+
+    report["requests"] = total_requests
+    report["errors"] = errors
+    report["requests_per_sec"] = round(total_requests / elapsed, 2) if elapsed else 0.0
+    return report
+
+def format_size(size):
+    if size >= 1024 * 1024:
+        return f"{size / 1024 / 1024:.1f}MB"
+    if size >= 1024:
+        return f"{size / 1024:.1f}KB"
+    return f"{size}B"
+
+def print_report(report):
+    print(f"\n📊 {report['requests']} 个请求, 耗时 {report['elapsed']:.2f}秒, "
+          f"{report['requests_per_sec']:.1f} 请求/秒 (并发 {report['concurrency']})")
+    if report["errors"]:
+        print(f"❌ {report['errors']} 个请求失败")
+
+    print(f"\n{'地址':<56} {'p50':>8} {'p95':>8} {'p99':>8} {'TTFB p50':>9} {'大小':>9}")
+    for key, target in report["targets"].items():
+        total = target["total"]
+        if not total:
+            print(f"❌ {key:<54} 全部失败 (状态 {target['status']})")
+            continue
+        label = key if len(key) <= 54 else "…" + key[-53:]
+        print(f"{'⚠️ ' if target['errors'] else '  '}{label:<54} {total['p50']:>6.1f}ms {total['p95']:>6.1f}ms "
+              f"{total['p99']:>6.1f}ms {target['ttfb']['p50']:>7.1f}ms {format_size(target['bytes']):>9}")
+
+    print("\n📦 按类型汇总:")
+    for kind, summary in report["kinds"].items():
+        total = summary["total"]
+        p95 = f"p95 {total['p95']:.1f}ms" if total else "全部失败"
+        print(f"   • {kind}: {summary['targets']} 个, {format_size(summary['bytes'])}, {p95}")
+
+def _metric(entry, path):
+    for key in path:
+        entry = entry.get(key) if isinstance(entry, dict) else None
+    return entry
+
+def compare_reports(previous, current, threshold=DEFAULT_THRESHOLD, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """比较两次结果，返回 (退化列表, 改善列表)，每项为 (名称, 指标, 旧值, 新值, 变化百分比)
+
+    逐地址比较两次都有的地址，并比较按类型的汇总（构建后文件名带哈希，逐地址对不上时仍可比较）。
+    """
+    regressions = []
+    improvements = []
+    pairs = [(key, previous["targets"][key], entry) for key, entry in current["targets"].items()
+             if key in previous["targets"]]
+    pairs += [(f"[{kind}]", previous["kinds"][kind], entry) for kind, entry in current["kinds"].items()
+              if kind in previous["kinds"]]
+
+    for name, old_entry, new_entry in pairs:
+        for path, label, is_time in COMPARED_METRICS:
+            old = _metric(old_entry, path)
+            new = _metric(new_entry, path)
+            if not old or new is None:
+                continue
+            if not is_time and old_entry.get("targets", 1) != new_entry.get("targets", 1):
+                # 两次的资源个数不同，类型汇总的总字节数没有可比性
+                continue
+            change = (new - old) / old * 100
+            if is_time and abs(new - old) < min_delta_ms:
+                continue
+            if change > threshold:
+                regressions.append((name, label, old, new, change))
+            elif change < -threshold:
+                improvements.append((name, label, old, new, change))
+    return regressions, improvements
+
+def print_comparison(regressions, improvements, threshold):
+    print(f"\n🔍 与上次结果比较 (阈值 {threshold:g}%):")
+    for title, items, icon in (("退化", regressions, "❌"), ("改善", improvements, "✅")):
+        if items:
+            print(f"   {icon} {title} {len(items)} 项:")
+            for name, label, old, new, change in items:
+                print(f"      • {name} {label}: {old:g} -> {new:g} ({change:+.1f}%)")
+    if not regressions and not improvements:
+        print("   ✅ 没有超过阈值的变化")
+
+def main():
+    parser = argparse.ArgumentParser(description="站点延迟与传输量基准测试")
+    add_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS,
+                        help=f"每个地址测量的次数 (默认: {DEFAULT_ITERATIONS})")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP,
+                        help=f"正式测量前每个地址预热请求的轮数 (默认: {DEFAULT_WARMUP})")
+    parser.add_argument("--no-assets", action="store_true", help="只测页面，不测引用的静态资源")
+    parser.add_argument("--output", help="把结果保存为JSON文件")
+    parser.add_argument("--compare", help="与之前保存的JSON结果比较")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"退化阈值百分比 (默认: {DEFAULT_THRESHOLD:g})")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help=f"小于该毫秒数的耗时变化不算退化 (默认: {DEFAULT_MIN_DELTA_MS:g})")
+    args = parser.parse_args()
+
+    benchmark = SiteBenchmark(args.base_url, args.app_dir, args.concurrency,
+                              follow_links=not (args.no_follow or args.routes))
+    try:
+        targets = discover_targets(benchmark, args.routes, include_assets=not args.no_assets)
+        pages = sum(1 for kind, _ in targets.values() if kind == "page")
+        print(f"🏁 {pages} 个页面, {len(targets) - pages} 个静态资源; "
+              f"预热 {args.warmup} 轮, 测量 {args.iterations} 轮")
+        samples, elapsed = asyncio.run(benchmark.run(list(targets), args.iterations, args.warmup))
+    finally:
+        benchmark.close()
+
+    report = build_report(targets, samples, elapsed, args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存: {args.output}")
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        regressions, improvements = compare_reports(previous, report, args.threshold, args.min_delta_ms)
+        print_comparison(regressions, improvements, args.threshold)
+
+    sys.exit(1 if regressions or report["errors"] else 0)
+
+if __name__ == "__main__":
+    main()
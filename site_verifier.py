@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+站点验证公共模块
+从 src/app/**/page.tsx 和页面中的链接发现全部路由，并发抓取页面及其样式表，
+再对每个页面运行各验证脚本的检查函数
+"""
+
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+import importlib
+from functools import cached_property
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from page_model import parse_html, parse_css
+
+DEFAULT_BASE_URL = "http://localhost:3000"
+DEFAULT_APP_DIR = "src/app"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 15
+
+# 最多抓取的页面数，防止链接发现失控
+DEFAULT_MAX_PAGES = 200
+
+HOME_ROUTE = "/"
+
+# 与 debug_page.py 相同的浏览器 UA
+USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+PAGE_FILES = ("page.tsx", "page.jsx", "page.ts", "page.js")
+
+# 各验证脚本模块名，都提供 check_page(page) -> bool
+CHECK_MODULES = ["final_verification", "simple_test", "visual_test", "debug_page", "final_diagnosis"]
+
+# 按扩展名判断静态资源类型
+ASSET_EXTENSIONS = {
+    ".css": "css",
+    ".js": "js", ".mjs": "js",
+    ".png": "image", ".jpg": "image", ".jpeg": "image", ".gif": "image", ".webp": "image",
+    ".avif": "image", ".svg": "image", ".ico": "image",
+    ".woff2": "font", ".woff": "font", ".ttf": "font", ".otf": "font",
+}
+
+# <link rel=preload as=...> 的取值到资源类型
+PRELOAD_TYPES = {"style": "css", "script": "js", "image": "image", "font": "font"}
+
+_HREF_RE = re.compile(r'<a\s[^>]*?href="([^"]+)"', re.IGNORECASE)
+_STYLESHEET_RE = re.compile(r'<link[^>]*href="([^"]*\.css[^"]*)"[^>]*>', re.IGNORECASE)
+
+def discover_routes(app_dir=DEFAULT_APP_DIR):
+    """按 Next.js App Router 约定从 page 文件推出路由
+
+    (group) 路由组不占路径，_private 目录和 [param] 动态路由无法直接访问，均跳过。
+    """
+    routes = []
+    for root, dirs, files in os.walk(app_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('_') and not d.startswith('['))
+        if not any(name in files for name in PAGE_FILES):
+            continue
+        segments = [s for s in os.path.relpath(root, app_dir).split(os.sep)
+                    if s != '.' and not (s.startswith('(') and s.endswith(')'))]
+        routes.append('/' + '/'.join(segments))
+    return sorted(set(routes))
+
+def normalize_route(path):
+    """去掉查询串、锚点和结尾的斜杠"""
+    path = path.split('#', 1)[0].split('?', 1)[0]
+    return path.rstrip('/') or '/'
+
+def extract_links(html, page_url, base_url):
+    """页面中指向本站的页面链接（不含静态资源和 /_next 下的文件）"""
+    origin = urlparse(base_url).netloc
+    links = set()
+    for href in _HREF_RE.findall(html):
+        url = urlparse(urljoin(page_url, href))
+        if url.scheme not in ('http', 'https') or url.netloc != origin:
+            continue
+        if url.path.startswith('/_next/') or os.path.splitext(url.path)[1]:
+            continue
+        links.add(normalize_route(url.path))
+    return links
+
+def extract_stylesheets(html, page_url):
+    """页面引用的样式表绝对地址，保持出现顺序"""
+    return list(dict.fromkeys(urljoin(page_url, href) for href in _STYLESHEET_RE.findall(html)))
+
+def asset_type(url):
+    """按扩展名判断静态资源类型：css / js / image / font，无法判断时为 other"""
+    return ASSET_EXTENSIONS.get(os.path.splitext(urlparse(url).path)[1].lower(), "other")
+
+def _srcset_urls(srcset):
+    return [candidate.split()[0] for candidate in srcset.split(',') if candidate.strip()]
+
+def page_assets(page):
+    """页面引用的本站静态资源 {绝对地址: 类型}，按出现顺序
+
+    来自样式表、脚本、图片（含 srcset）、favicon 以及 preload 的链接；其他站点的资源不计。
+    """
+    document = page.document
+    origin = urlparse(page.url).netloc
+    found = []
+    for element in document.elements:
+        attrs = element.attrs
+        if element.tag == "link" and attrs.get("href"):
+            rel = attrs.get("rel", "").lower().split()
+            if "stylesheet" in rel:
+                found.append((attrs["href"], "css"))
+            elif "modulepreload" in rel:
+                found.append((attrs["href"], "js"))
+            elif "preload" in rel:
+                found.append((attrs["href"], PRELOAD_TYPES.get(attrs.get("as", ""))))
+            elif "icon" in rel:
+                found.append((attrs["href"], "image"))
+        elif element.tag == "script" and attrs.get("src"):
+            found.append((attrs["src"], "js"))
+        elif element.tag in ("img", "source"):
+            if attrs.get("src"):
+                found.append((attrs["src"], "image"))
+            for url in _srcset_urls(attrs.get("srcset", "")):
+                found.append((url, "image"))
+
+    assets = {}
+    for href, hint in found:
+        url = urljoin(page.url, href)
+        if urlparse(url).netloc == origin and url not in assets:
+            assets[url] = hint or asset_type(url)
+    return assets
+
+class Page:
+    """一次页面抓取的结果，供各脚本的检查函数使用"""
+
+    def __init__(self, route, url):
+        self.route = route
+        self.url = url
+        self.status = None
+        self.html = ''
+        self.headers = CaseInsensitiveDict()
+        self.elapsed = 0.0
+        self.error = None
+        # 样式表地址 -> (状态码, 内容)
+        self.stylesheets = {}
+
+    @property
+    def ok(self):
+        return self.status == 200
+
+    @property
+    def is_home(self):
+        return self.route == HOME_ROUTE
+
+    @property
+    def css_ok(self):
+        """至少引用了一个样式表，且全部加载成功"""
+        return bool(self.stylesheets) and all(status == 200 for status, _ in self.stylesheets.values())
+
+    @property
+    def css_content(self):
+        """页面全部样式表内容拼接后的文本"""
+        return '\n'.join(text for status, text in self.stylesheets.values() if status == 200)
+
+    @cached_property
+    def document(self):
+        """解析后的HTML索引，各检查函数共用，只解析一次"""
+        return parse_html(self.html)
+
+    @cached_property
+    def stylesheet(self):
+        """全部样式表解析后的规则索引"""
+        return parse_css(self.css_content)
+
+class SiteVerifier:
+    """并发抓取站点页面
+
+    请求通过共享的 requests 会话在线程中执行，连接池大小等于并发数；
+    每个页面抓到后立即开始抓它引用的样式表和新发现的链接，
+    同一样式表在所有页面间只请求一次。
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, app_dir=DEFAULT_APP_DIR, concurrency=DEFAULT_CONCURRENCY,
+                 timeout=DEFAULT_TIMEOUT, follow_links=True, max_pages=DEFAULT_MAX_PAGES):
+        self.base_url = base_url.rstrip('/')
+        self.app_dir = app_dir
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.follow_links = follow_links
+        self.max_pages = max_pages
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = USER_AGENT
+        self._semaphore = None
+        self._css_tasks = {}
+
+    def close(self):
+        self.session.close()
+
+    async def fetch(self, url, **kwargs):
+        """在并发上限内发出一次GET请求，返回 (响应或None, 耗时秒数, 错误信息)"""
+        async with self._semaphore:
+            start_time = time.perf_counter()
+            try:
+                response = await asyncio.to_thread(self.session.get, url, timeout=self.timeout, **kwargs)
+                return response, time.perf_counter() - start_time, None
+            except requests.RequestException as e:
+                return None, time.perf_counter() - start_time, str(e)
+
+    async def _fetch_css(self, url):
+        response, _, error = await self.fetch(url)
+        if response is None:
+            return None, error
+        return response.status_code, response.text
+
+    async def _fetch_page(self, route):
+        page = Page(route, self.base_url + route)
+        response, page.elapsed, page.error = await self.fetch(page.url)
+        if response is None:
+            return page
+        page.status = response.status_code
+        # 保持大小写不敏感，服务器返回小写的 content-type 时也能查到
+        page.headers = CaseInsensitiveDict(response.headers)
+        page.html = response.text
+
+        css_urls = extract_stylesheets(page.html, page.url)
+        for css_url in css_urls:
+            if css_url not in self._css_tasks:
+                self._css_tasks[css_url] = asyncio.ensure_future(self._fetch_css(css_url))
+        for css_url in css_urls:
+            page.stylesheets[css_url] = await self._css_tasks[css_url]
+        return page
+
+    async def crawl(self, routes=None):
+        """抓取给定路由（默认自动发现），并跟随页面中的站内链接；返回按路由排序的页面列表"""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._css_tasks = {}
+        routes = routes or discover_routes(self.app_dir) or [HOME_ROUTE]
+        seen = set()
+        tasks = set()
+
+        def schedule(route):
+            if route not in seen and len(seen) < self.max_pages:
+                seen.add(route)
+                tasks.add(asyncio.ensure_future(self._fetch_page(route)))
+
+        for route in routes:
+            schedule(normalize_route(route))
+
+        pages = []
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page = task.result()
+                pages.append(page)
+                if self.follow_links and page.ok:
+                    for link in sorted(extract_links(page.html, page.url, self.base_url)):
+                        schedule(link)
+        return sorted(pages, key=lambda page: page.route)
+
+    def crawl_sync(self, routes=None):
+        return asyncio.run(self.crawl(routes))
+
+def add_arguments(parser):
+    """给各验证脚本的命令行添加公共参数"""
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help=f"站点地址 (默认: {DEFAULT_BASE_URL})")
+    parser.add_argument("--routes", nargs="+", help="只检查这些路由（默认从 src/app 自动发现）")
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR, help="Next.js app 目录，用于发现路由")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"同时在途的请求数 (默认: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--no-follow", action="store_true", help="不跟随页面中的站内链接")
+    return parser
+
+def parse_args(description, argv=None):
+    """只含公共参数的命令行解析"""
+    return add_arguments(argparse.ArgumentParser(description=description)).parse_args(argv)
+
+def verify_site(checks, base_url=DEFAULT_BASE_URL, routes=None, app_dir=DEFAULT_APP_DIR,
+                concurrency=DEFAULT_CONCURRENCY, follow_links=True):
+    """并发抓取全部页面后依次对每个页面运行 checks，返回 (页面列表, {路由: 是否通过})"""
+    verifier = SiteVerifier(base_url, app_dir, concurrency, follow_links=follow_links)
+    start_time = time.perf_counter()
+    try:
+        pages = verifier.crawl_sync(routes)
+    finally:
+        verifier.close()
+    crawl_time = time.perf_counter() - start_time
+    print(f"🌐 抓取 {len(pages)} 个页面, 耗时 {crawl_time:.2f}秒 (并发 {concurrency})")
+
+    results = {}
+    for page in pages:
+        print(f"\n📄 {page.route}  [{page.status or '无响应'}] {page.elapsed * 1000:.0f}ms")
+        if not page.ok:
+            print(f"❌ 页面访问失败: {page.error or page.status}")
+            results[page.route] = False
+            continue
+        # 每个检查都要运行，不因前一个失败而短路
+        outcomes = [check(page) for check in checks]
+        results[page.route] = all(outcome is not False for outcome in outcomes)
+    return pages, results
+
+def verify_from_args(checks, args):
+    """按公共命令行参数运行 verify_site；指定了 --routes 时只检查这些路由"""
+    return verify_site(checks, args.base_url, args.routes, args.app_dir, args.concurrency,
+                       follow_links=not (args.no_follow or args.routes))
+
+def print_results(results):
+    """打印每个路由的通过情况"""
+    print("\n" + "=" * 60)
+    passed = sum(1 for ok in results.values() if ok)
+    print(f"📊 {passed}/{len(results)} 个页面通过检查")
+    for route, ok in results.items():
+        print(f"   {'✅' if ok else '❌'} {route}")
+
+def main():
+    parser = argparse.ArgumentParser(description="并发验证整个站点")
+    add_arguments(parser)
+    parser.add_argument("--checks", nargs="+", choices=CHECK_MODULES, default=CHECK_MODULES,
+                        help="要运行的检查脚本 (默认: 全部)")
+    args = parser.parse_args()
+
+    checks = [importlib.import_module(name).check_page for name in args.checks]
+    _, results = verify_from_args(checks, args)
+    print_results(results)
+    sys.exit(0 if results and all(results.values()) else 1)
+
+if __name__ == "__main__":
+    main()